@@ -1,18 +1,40 @@
 # cleanup_cog.py
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import logging
 import asyncio
+from dataclasses import dataclass
+from cogs.message_utils import is_stale_bot_message, purge_bot_messages
+from cogs.constants import SOS_VOICE_CHANNEL_PREFIX
+
+# Only the Server_Listing fields cleanup reads
+_CLEANUP_PROJECTION = {"discord_server_id": 1, "gpt_channel_id": 1, "_id": 0}
+
+# Server_Listing documents fetched per cursor round trip during cleanup
+CLEANUP_BATCH_SIZE = 500
+
+# Maximum number of guilds cleaned up concurrently, to stay clear of Discord's global rate limit.
+CLEANUP_CONCURRENCY = 8
+
+
+@dataclass(slots=True)
+class ServerCfg:
+    """The Server_Listing fields cleanup needs for one guild, without a per-document dict."""
+    discord_server_id: int
+    gpt_channel_id: int | None = None
+
 
 class CleanupCog(commands.Cog):
     """
-    Periodically and on-startup cleans up old SOS messages, empty voice channels,
-    and old menu view messages in each server's designated GPT channel.
+    On startup, cleans up old SOS messages, empty voice channels, and old menu
+    view messages in each server's designated GPT channel. This recovers from
+    restarts/crashes; while running, SOSCog expires its own SOS broadcasts.
     """
     def __init__(self, bot):
         self.bot = bot
         self.sos_cog = None
         self.guild_management_cog = None
+        self.cleanup_semaphore = asyncio.Semaphore(CLEANUP_CONCURRENCY)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -26,42 +48,9 @@ class CleanupCog(commands.Cog):
                 logging.warning("SOSCog or GuildManagementCog not loaded. CleanupCog cannot function properly.")
                 return
 
-            # Start the periodic cleanup if not already running
-            if not self.periodic_cleanup.is_running():
-                self.periodic_cleanup.start()
-
             # Perform one-time cleanup on startup
             await self.perform_startup_cleanup()
 
-    @tasks.loop(hours=1)
-    async def periodic_cleanup(self):
-        """
-        Regularly cleans up old SOS messages and old menu views in GPT channels.
-        """
-        logging.info("Starting periodic cleanup of SOS messages and menu views.")
-        server_listing = self.bot.mongo_db['Server_Listing']
-
-        all_servers = await server_listing.find({}).to_list(None)
-        for server_data in all_servers:
-            guild_id = server_data.get("discord_server_id")
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                logging.warning(f"Guild with ID {guild_id} not found.")
-                continue
-
-            gpt_channel_id = server_data.get("gpt_channel_id")
-            gpt_channel = guild.get_channel(gpt_channel_id)
-            if not gpt_channel or not isinstance(gpt_channel, discord.TextChannel):
-                # Guard: gpt_channel might be None or a CategoryChannel, etc.
-                logging.warning(f"GPT channel for guild '{guild.name}' not found or not a TextChannel.")
-                continue
-
-            await self.delete_old_sos_and_menu_messages(guild, gpt_channel)
-
-    @periodic_cleanup.before_loop
-    async def before_periodic_cleanup(self):
-        await self.bot.wait_until_ready()
-
     async def perform_startup_cleanup(self):
         """
         Cleans up leftover 'SOS QRF#' voice channels and old messages 
@@ -69,56 +58,84 @@ class CleanupCog(commands.Cog):
         """
         logging.info("Performing startup cleanup.")
         server_listing = self.bot.mongo_db['Server_Listing']
-        all_servers = await server_listing.find({}).to_list(None)
+        cursor = server_listing.find({}, _CLEANUP_PROJECTION).batch_size(CLEANUP_BATCH_SIZE)
 
-        for server_data in all_servers:
-            guild_id = server_data.get("discord_server_id")
-            gpt_channel_id = server_data.get("gpt_channel_id")
+        # The loop only streams records and schedules their cleanups; each cleanup
+        # waits for a cleanup_semaphore slot, so at most CLEANUP_CONCURRENCY run at once
+        tasks = []
+        try:
+            async for doc in cursor:
+                if "discord_server_id" not in doc:
+                    continue
+                tasks.append(asyncio.create_task(self._cleanup_one_guild(ServerCfg(**doc))))
+        except Exception as e:
+            logging.error("Error reading Server_Listing during startup cleanup: %s", e)
+        finally:
+            # Cleanups already scheduled still run to completion if the cursor fails
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error("Startup cleanup failed for a guild: %s", result)
+
+    async def _cleanup_one_guild(self, server_cfg: ServerCfg):
+        """
+        Cleans up a single guild from its Server_Listing record: empty 'SOS QRF#'
+        voice channels and old SOS/menu messages in its GPT channel. Holds a
+        cleanup_semaphore slot while it runs.
+        """
+        async with self.cleanup_semaphore:
+            guild_id = server_cfg.discord_server_id
+            gpt_channel_id = server_cfg.gpt_channel_id
 
             guild = self.bot.get_guild(guild_id)
             if not guild:
-                logging.warning(f"Guild with ID {guild_id} not found. Skipping cleanup.")
-                continue
+                logging.warning("Guild with ID %s not found. Skipping cleanup.", guild_id)
+                return
 
             # 1) Remove leftover 'SOS QRF#' channels that are empty
-            for voice_channel in guild.voice_channels:
-                if voice_channel.name.startswith("SOS QRF#"):
-                    if len(voice_channel.members) == 0:
-                        try:
-                            logging.info(f"Deleting leftover voice channel: {voice_channel.name} in guild: {guild.name}")
-                            await voice_channel.delete()
-                        except Exception as e:
-                            logging.error(f"Failed to delete voice channel {voice_channel.name}: {e}")
+            empties = [
+                vc for vc in guild.voice_channels
+                if vc.name.startswith(SOS_VOICE_CHANNEL_PREFIX) and not vc.members
+            ]
+            if empties:
+                await asyncio.gather(*(self._delete_leftover_voice_channel(guild, vc) for vc in empties))
 
             # 2) Remove old SOS/menu messages from the GPT channel
-            gpt_channel = guild.get_channel(gpt_channel_id)
-            if not gpt_channel or not isinstance(gpt_channel, discord.TextChannel):
+            # The channel ID is known from Mongo, so resolve it through the bot-wide channel map
+            gpt_channel = self.bot.get_channel(gpt_channel_id)
+            if not gpt_channel or not isinstance(gpt_channel, discord.TextChannel) or gpt_channel.guild.id != guild.id:
+                # Guard: gpt_channel might be None or a CategoryChannel, etc.
                 logging.warning(
-                    f"GPT channel with ID {gpt_channel_id} not found or not a TextChannel in guild '{guild.name}'. Skipping cleanup."
+                    "GPT channel with ID %s not found or not a TextChannel in guild '%s'. Skipping cleanup.", gpt_channel_id, guild.name
                 )
-                continue
+                return
 
             await self.delete_old_sos_and_menu_messages(guild, gpt_channel)
 
+    async def _delete_leftover_voice_channel(self, guild: discord.Guild, voice_channel: discord.VoiceChannel):
+        try:
+            logging.info("Deleting leftover voice channel: %s in guild: %s", voice_channel.name, guild.name)
+            await voice_channel.delete()
+        except Exception as e:
+            logging.error("Failed to delete voice channel %s: %s", voice_channel.name, e)
+
     async def delete_old_sos_and_menu_messages(self, guild: discord.Guild, gpt_channel: discord.TextChannel):
         """
-        Deletes old SOS 'activated' messages and old 'menu view' 
-        messages from the specified GPT channel.
+        Deletes old SOS 'activated' messages and pre-rename 'menu view'
+        messages from the specified GPT channel. Messages carrying the
+        live menu title are left alone: GuildManagementCog.refresh_sos_menu
+        runs concurrently on startup and owns replacing the live menu.
         """
         try:
-            async for message in gpt_channel.history(limit=100):
-                # Check for messages from the bot that have an embed
-                if message.author == self.bot.user and message.embeds:
-                    embed = message.embeds[0]
-                    # Check for SOS or menu embed
-                    if embed.title == "SOS ACTIVATED":
-                        logging.info(f"Deleting old SOS message in '{guild.name}' (Message ID: {message.id}).")
-                        await message.delete()
-                    elif embed.title == "Welcome to the SOS Alliance Network!":
-                        logging.info(f"Deleting old menu view message in '{guild.name}' (Message ID: {message.id}).")
-                        await message.delete()
+            deleted = await purge_bot_messages(
+                gpt_channel,
+                is_stale_bot_message,
+                reason="Cleaning up old SOS/menu messages."
+            )
+            if deleted:
+                logging.info("Deleted %s old SOS/menu messages in '%s'.", len(deleted), guild.name)
         except Exception as e:
-            logging.error(f"Error during cleanup in guild '{guild.name}': {e}")
+            logging.error("Error during cleanup in guild '%s': %s", guild.name, e)
 
 async def setup(bot):
     await bot.add_cog(CleanupCog(bot))
@@ -0,0 +1,7 @@
+# constants.py
+
+# Category holding the GPT network channels in every guild
+CATEGORY_NAME = "GPT NETWORK"
+
+# Name prefix of the temporary voice channels SOSCog creates
+SOS_VOICE_CHANNEL_PREFIX = "SOS QRF#"
@@ -33,15 +33,15 @@ class DMResponseCog(commands.Cog):
     #             return
 
     #         # Skip if the member is the initiator
-    #         if member.id == sos_data['initiator_id']:
+    #         if member.id == sos_data.initiator_id:
     #             logging.info(f"Skipping DM for SOS host: {member.display_name}")
     #             return
 
     #         # Check if the member has already been prompted
-    #         if member.id in sos_data['prompted_users']:
+    #         if member.id in sos_data.prompted_users:
     #             return
 
-    #         sos_data['prompted_users'].add(member.id)
+    #         sos_data.prompted_users.add(member.id)
 
     #         dm_channel = await member.create_dm()
     #         view = SOSResponseView(sos_data, member)
@@ -49,7 +49,7 @@ class DMResponseCog(commands.Cog):
     #             content="Do you wish to respond to this SOS?",
     #             view=view
     #         )
-    #         sos_data['dm_messages'][member.id] = dm_message
+    #         sos_data.dm_messages[member.id] = dm_message
     #         view.interaction_message = dm_message
 
     #     except Exception as e:
@@ -110,38 +110,39 @@ class SOSYesButton(discord.ui.Button):
         sos_data = self.view.sos_data
         member = self.view.member
 
-        async with sos_data['lock']:
-            status_field = sos_data['embed'].fields[sos_data['status_index']]
+        async with sos_data.lock:
+            status_field = sos_data.embed.fields[sos_data.status_index]
             if status_field.value == '**Closed**':
                 await interaction.response.send_message("Sorry, this SOS is already closed.", ephemeral=True)
                 return
 
-            if member.id in sos_data['users']:
+            if member.id in sos_data.user_ids:
                 await interaction.response.send_message("You have already responded to this SOS.", ephemeral=True)
                 return
 
             # Add the member to Fleet Response
-            sos_data['users'][member.id] = member.display_name
-            fleet_response = '\n'.join(sos_data['users'].values())
+            sos_data.user_ids.add(member.id)
+            sos_data.fleet_response += '\n' + member.display_name
+            fleet_response = sos_data.fleet_response
 
-            sos_data['embed'].set_field_at(
-                index=sos_data['fleet_response_index'],
+            sos_data.embed.set_field_at(
+                index=sos_data.fleet_response_index,
                 name='Fleet Response',
                 value=fleet_response,
                 inline=False
             )
 
-            if len(sos_data['users']) >= 4:
-                sos_data['embed'].set_field_at(
-                    index=sos_data['status_index'],
+            if len(sos_data.user_ids) >= 4:
+                sos_data.embed.set_field_at(
+                    index=sos_data.status_index,
                     name='Status',
                     value='**Closed**',
                     inline=False
                 )
 
             # Update all SOS messages
-            for msg in sos_data['sos_messages'].values():
-                await msg.edit(embed=sos_data['embed'])
+            for msg in sos_data.sos_messages.values():
+                await msg.edit(embed=sos_data.embed)
 
             await interaction.response.send_message("You have been added to the Fleet Response.", ephemeral=True)
             self.view.stop()
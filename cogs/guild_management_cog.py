@@ -2,6 +2,96 @@ import discord
 from discord.ext import commands
 import logging
 import asyncio # Import asyncio for sleep
+import hashlib
+import json
+from collections import defaultdict
+from operator import attrgetter
+from cogs.message_utils import is_sos_or_menu_message, purge_bot_messages
+from cogs.constants import CATEGORY_NAME
+from cogs.server_listing_cache import get_server_data, update_cached_server_data
+
+# Maximum number of guilds set up concurrently on startup
+SETUP_CONCURRENCY = 4
+
+# History scanned for a stale SOS menu when its stored message ID is missing, and
+# how many matches to delete before the scan stops early.
+REFRESH_HISTORY_LIMIT = 25
+REFRESH_MAX_STALE_MESSAGES = 2
+
+GPT_CHANNEL_NAME = "❗｜LFG-SOS"
+MONITOR_CHANNEL_NAME = "❗｜monitor"
+LEADERBOARD_CHANNEL_NAME = "❗｜leaderboard"
+GPT_STAT_ACCESS_ROLE_NAME = "GPT STAT ACCESS"
+SOS_LFG_ROLE_NAME = "SOS LFG" # Role name without the '@' symbol
+SOS_LFG_ROLE_COLOR = 0xfaee10 # Hex color for #faee10
+
+# The names of the channels the bot *should* manage in the category
+TARGET_CHANNEL_NAMES = frozenset({GPT_CHANNEL_NAME, MONITOR_CHANNEL_NAME, LEADERBOARD_CHANNEL_NAME})
+
+# Permission overwrites used by setup_guild. They are only read when composing the
+# per-guild overwrite dicts, so one shared instance of each is enough.
+_PO_BOT = discord.PermissionOverwrite(
+    view_channel=True,
+    send_messages=True,
+    add_reactions=True,
+    read_message_history=True
+)
+_PO_CATEGORY_DEFAULT = discord.PermissionOverwrite(
+    view_channel=True,
+    read_message_history=True, # Default should allow reading history
+    send_messages=False, # Default prevents sending
+    connect=True, # Default allows connecting to voice channels
+    add_reactions=False  # Default prevents reactions
+)
+_PO_READ_ONLY = discord.PermissionOverwrite(
+    view_channel=True,
+    read_message_history=True,
+    send_messages=False, # Can see but not send messages
+    add_reactions=False
+)
+_PO_HIDDEN_DEFAULT = discord.PermissionOverwrite(
+    view_channel=False, # Hidden from @everyone by default
+    read_message_history=False,
+    send_messages=False,
+    add_reactions=False
+)
+_PO_HIDDEN = discord.PermissionOverwrite(view_channel=False)
+
+
+def _overwrites_match(current: dict, desired: dict) -> bool:
+    """
+    Compares two permission overwrite mappings by target ID and (allow, deny) pair,
+    so an unchanged channel/category can skip its edit REST call.
+    """
+    def normalize(overwrites):
+        return {target.id: overwrite.pair() for target, overwrite in overwrites.items()}
+    return normalize(current) == normalize(desired)
+
+
+def _overwrites_key(overwrites: dict) -> list:
+    """JSON-serializable, order-independent form of a permission overwrite mapping."""
+    key = []
+    for target, overwrite in overwrites.items():
+        allow, deny = overwrite.pair()
+        key.append([target.id, allow.value, deny.value])
+    return sorted(key)
+
+
+def _config_fingerprint(guild_name: str, category: list, channels: dict, extraneous: list, roles: dict) -> str:
+    """
+    Hashes the parts of a guild's structure that setup_guild manages. The same
+    fingerprint is built from the desired state after setup and from the live
+    guild state on the next run; a match means setup has nothing to change.
+    """
+    state = {
+        "guild_name": guild_name,
+        "category": category,
+        "channels": channels,
+        "extraneous": extraneous,
+        "roles": roles,
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
 
 class GuildManagementCog(commands.Cog):
     """
@@ -12,13 +102,26 @@ class GuildManagementCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        """
+        Ensure Server_Listing is indexed on discord_server_id so the per-guild upsert
+        and lookups are index scans instead of collection scans. Idempotent.
+        """
+        try:
+            await self.bot.mongo_db["Server_Listing"].create_index("discord_server_id", unique=True)
+            logging.info("Ensured unique index on Server_Listing.discord_server_id.")
+        except Exception as e:
+            # e.g. pre-existing duplicate documents; lookups still work, just unindexed
+            logging.error("Failed to create index on Server_Listing.discord_server_id: %s", e)
+
     async def _find_and_clean_specific_channel(
         self,
         guild: discord.Guild,
         category: discord.CategoryChannel,
         channel_name: str,
         overwrites: dict,
-        reason: str
+        reason: str,
+        text_channels_by_name: dict
     ):
         """
         Finds channels matching the specific name (potentially globally first, then in category),
@@ -26,6 +129,9 @@ class GuildManagementCog(commands.Cog):
         only one such channel exists globally (deleting duplicates).
         Returns the final channel object.
 
+        text_channels_by_name maps each text channel name in the guild to the list of
+        channels with that name, built once per setup_guild call.
+
         Note: The main setup_guild function now includes a prior step that handles deleting
               channels in the category that *don't* match the target names. This helper
               focuses on finding the correct channel *by the target name*, ensuring it's
@@ -34,7 +140,7 @@ class GuildManagementCog(commands.Cog):
               pass might have missed (though less likely after the category cleanup).
         """
         # Find channels with the exact name globally first
-        channels_with_name = [c for c in guild.text_channels if c.name == channel_name]
+        channels_with_name = list(text_channels_by_name.get(channel_name, ()))
 
         target_channel = None
 
@@ -43,40 +149,40 @@ class GuildManagementCog(commands.Cog):
 
         if channels_in_category_with_name:
             # If multiple in category, keep the newest one
-            channels_in_category_with_name.sort(key=lambda c: c.created_at, reverse=True)
+            channels_in_category_with_name.sort(key=attrgetter("created_at"), reverse=True)
             target_channel = channels_in_category_with_name[0]
 
             # Delete older duplicates found within the category
             for old_channel in channels_in_category_with_name[1:]:
                  if old_channel.permissions_for(guild.me).manage_channels:
                      try:
-                         logging.info(f"Deleting older duplicate channel '{old_channel.name}' (ID: {old_channel.id}) in category '{category.name}' in guild '{guild.name}'.")
+                         logging.info("Deleting older duplicate channel '%s' (ID: %s) in category '%s' in guild '%s'.", old_channel.name, old_channel.id, category.name, guild.name)
                          await old_channel.delete(reason=f"Cleaning up older duplicate '{channel_name}' channel.")
                          await asyncio.sleep(0.5) # Small delay
                      except Exception as e:
-                         logging.error(f"Error deleting older duplicate channel '{old_channel.name}' (ID: {old_channel.id}): {e}")
+                         logging.error("Error deleting older duplicate channel '%s' (ID: %s): %s", old_channel.name, old_channel.id, e)
 
         elif channels_with_name:
             # If no channels were in the category, but some exist globally with the name
             # Keep the newest one globally and move it to the category
-            channels_with_name.sort(key=lambda c: c.created_at, reverse=True)
+            channels_with_name.sort(key=attrgetter("created_at"), reverse=True)
             target_channel = channels_with_name[0]
 
              # Delete other duplicates found globally
             for old_channel in channels_with_name[1:]:
                  if old_channel.permissions_for(guild.me).manage_channels:
                      try:
-                         logging.info(f"Deleting extraneous global channel '{old_channel.name}' (ID: {old_channel.id}) in guild '{guild.name}'.")
+                         logging.info("Deleting extraneous global channel '%s' (ID: %s) in guild '%s'.", old_channel.name, old_channel.id, guild.name)
                          await old_channel.delete(reason=f"Cleaning up extraneous global '{channel_name}' channel.")
                          await asyncio.sleep(0.5) # Small delay
                      except Exception as e:
-                         logging.error(f"Error deleting extraneous global channel '{old_channel.name}' (ID: {old_channel.id}): {e}")
+                         logging.error("Error deleting extraneous global channel '%s' (ID: %s): %s", old_channel.name, old_channel.id, e)
 
 
         # If no channel was found by name globally, create a new one in the category
         if target_channel is None:
             try:
-                logging.info(f"Creating channel '#{channel_name}' in category '{category.name}' in guild '{guild.name}'.")
+                logging.info("Creating channel '#%s' in category '%s' in guild '%s'.", channel_name, category.name, guild.name)
                 target_channel = await guild.create_text_channel(
                     name=channel_name,
                     overwrites=overwrites,
@@ -84,23 +190,26 @@ class GuildManagementCog(commands.Cog):
                     reason=reason
                 )
             except Exception as e:
-                logging.error(f"Error creating channel '#{channel_name}' in guild '{guild.name}': {e}")
+                logging.error("Error creating channel '#%s' in guild '%s': %s", channel_name, guild.name, e)
                 return None
         else:
             # If a channel was found, ensure it's in the right category and has correct overwrites
-            # We always attempt to update overwrites to ensure consistency
+            # Only edit when something differs, since each edit is a rate-limited REST write
             if target_channel.category != category:
-                logging.info(f"Moving channel '#{target_channel.name}' (ID: {target_channel.id}) to category '{category.name}'.")
+                logging.info("Moving channel '#%s' (ID: %s) to category '%s'.", target_channel.name, target_channel.id, category.name)
+            elif _overwrites_match(target_channel.overwrites, overwrites):
+                logging.debug("Channel '#%s' (ID: %s) already up to date. Skipping edit.", target_channel.name, target_channel.id)
+                return target_channel
 
              # Check bot has permissions to manage this channel before editing
             if target_channel.permissions_for(guild.me).manage_channels:
                 try:
                    await target_channel.edit(category=category, overwrites=overwrites, reason=f"Ensuring channel setup for '{channel_name}'.")
-                   logging.info(f"Updated channel '#{target_channel.name}' (ID: {target_channel.id}) category/overwrites.")
+                   logging.info("Updated channel '#%s' (ID: %s) category/overwrites.", target_channel.name, target_channel.id)
                 except Exception as e:
-                   logging.error(f"Error editing channel '#{target_channel.name}' (ID: {target_channel.id}) in guild '{guild.name}': {e}")
+                   logging.error("Error editing channel '#%s' (ID: %s) in guild '%s': %s", target_channel.name, target_channel.id, guild.name, e)
             else:
-                logging.warning(f"Bot lacks 'Manage Channels' permission for channel '{target_channel.name}' (ID: {target_channel.id}). Cannot edit category/overwrites.")
+                logging.warning("Bot lacks 'Manage Channels' permission for channel '%s' (ID: %s). Cannot edit category/overwrites.", target_channel.name, target_channel.id)
 
 
         return target_channel
@@ -117,19 +226,21 @@ class GuildManagementCog(commands.Cog):
           - #monitor channel visible only to GPT STAT ACCESS + bot (no reactions)
           - #leaderboard channel, read-only to everyone but the bot
           - Finally, store all relevant IDs in the Server_Listing collection.
+        Channel/role setup is skipped when the guild still matches the config
+        fingerprint stored by the last successful run; the menu is still refreshed.
         """
-        category_name = "GPT NETWORK"
-        gpt_channel_name = "❗｜LFG-SOS"
-        monitor_channel_name = "❗｜monitor"
-        leaderboard_channel_name = "❗｜leaderboard"
-        sos_lfg_role_name = "SOS LFG" # Role name without the '@' symbol
-        sos_lfg_role_color = 0xfaee10 # Hex color for #faee10
+        category_name = CATEGORY_NAME
+        gpt_channel_name = GPT_CHANNEL_NAME
+        monitor_channel_name = MONITOR_CHANNEL_NAME
+        leaderboard_channel_name = LEADERBOARD_CHANNEL_NAME
+        sos_lfg_role_name = SOS_LFG_ROLE_NAME
+        sos_lfg_role_color = SOS_LFG_ROLE_COLOR
 
         # Define the names of the channels the bot *should* manage in the category
-        target_channel_names = {gpt_channel_name, monitor_channel_name, leaderboard_channel_name}
+        target_channel_names = TARGET_CHANNEL_NAMES
 
 
-        logging.info(f"Starting setup for guild: {guild.name} (ID: {guild.id})")
+        logging.info("Starting setup for guild: %s (ID: %s)", guild.name, guild.id)
 
         bot_member = guild.me
         # Check for necessary permissions early
@@ -153,36 +264,43 @@ class GuildManagementCog(commands.Cog):
                   # --- Simplified Logging Here ---
                   # Bot doesn't have Administrator and also doesn't have the specific needed perms.
                   logging.warning(
-                      f"Bot lacks sufficient permissions to perform setup in guild '{guild.name}' (ID: {guild.id}). Skipping setup."
+                      "Bot lacks sufficient permissions to perform setup in guild '%s' (ID: %s). Skipping setup.", guild.name, guild.id
                   )
                   return # Skip the rest of the setup if permissions are insufficient
              # Else: bot_member.guild_permissions >= required_permissions is True, proceed
 
 
         # If we reach here, the bot either has Administrator or the specific required permissions.
-        logging.info(f"Bot has sufficient permissions for setup in guild '{guild.name}'. Proceeding.")
+        logging.info("Bot has sufficient permissions for setup in guild '%s'. Proceeding.", guild.name)
+
+        # Index the guild's channels, categories and roles by name once, instead of a
+        # linear scan per lookup. Text channels are grouped since duplicates are cleaned
+        # up below; for categories/roles the first match wins, as with discord.utils.get.
+        text_channels_by_name = defaultdict(list)
+        for text_channel in guild.text_channels:
+            text_channels_by_name[text_channel.name].append(text_channel)
+        categories_by_name = {c.name: c for c in reversed(guild.categories)}
+        roles_by_name = {r.name: r for r in reversed(guild.roles)}
+
+        # If the live guild still matches the fingerprint stored by the last successful
+        # setup, steps 1-7 have nothing to change; skip straight to the menu refresh.
+        stored_data = await get_server_data(self.bot, guild.id)
+        stored_fp = stored_data.get("config_fp") if stored_data else None
+        if not force_refresh and stored_fp and stored_fp == self._live_config_fingerprint(guild, text_channels_by_name, categories_by_name, roles_by_name):
+            logging.info("Guild '%s' configuration unchanged since last setup. Skipping channel/role setup.", guild.name)
+            await self.refresh_sos_menu(guild, force_refresh)
+            return
 
 
         # ----------------------------------------------------------------------
         # 1) Create (or retrieve) GPT NETWORK category with default overwrites
         # ----------------------------------------------------------------------
         category_overwrites = {
-            guild.default_role: discord.PermissionOverwrite(
-                view_channel=True,
-                read_message_history=True, # Default should allow reading history
-                send_messages=False, # Default prevents sending
-                connect=True, # Default allows connecting to voice channels
-                add_reactions=False  # Default prevents reactions
-            ),
-            bot_member: discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=True,
-                add_reactions=True,
-                read_message_history=True
-            )
+            guild.default_role: _PO_CATEGORY_DEFAULT,
+            bot_member: _PO_BOT
         }
 
-        category = discord.utils.get(guild.categories, name=category_name)
+        category = categories_by_name.get(category_name)
         if not category:
             try:
                 category = await guild.create_category(
@@ -190,28 +308,28 @@ class GuildManagementCog(commands.Cog):
                     overwrites=category_overwrites,
                     reason="Category for GPT Network channels."
                 )
-                logging.info(f"Created category '{category.name}' (ID: {category.id}) in guild '{guild.name}'.")
+                logging.info("Created category '%s' (ID: %s) in guild '%s'.", category.name, category.id, guild.name)
             except Exception as e:
-                logging.error(f"Error creating category '{category_name}' in guild '{guild.name}': {e}")
+                logging.error("Error creating category '%s' in guild '%s': %s", category_name, guild.name, e)
                 return
-        else:
+        elif not _overwrites_match(category.overwrites, category_overwrites):
             try:
-                # Always update category overwrites to ensure they are correct
+                # Update category overwrites only when they've drifted from the desired state
                 await category.edit(overwrites=category_overwrites, reason="Updating category overwrites.")
-                logging.info(f"Updated permission overwrites for category '{category.name}' (ID: {category.id}).")
+                logging.info("Updated permission overwrites for category '%s' (ID: %s).", category.name, category.id)
             except Exception as e:
-                logging.warning(f"Could not update category overwrites for '{category_name}': {e}")
+                logging.warning("Could not update category overwrites for '%s': %s", category_name, e)
 
         # If category creation/finding failed, we can't proceed
         if not category:
-             logging.error(f"Could not find or create category '{category_name}' in guild '{guild.name}'. Skipping channel setup.")
+             logging.error("Could not find or create category '%s' in guild '%s'. Skipping channel setup.", category_name, guild.name)
              return
 
         # ----------------------------------------------------------------------
         # Clean up extraneous channels within the GPT NETWORK category
         # Delete any text channel in this category whose name is NOT one of our target names.
         # ----------------------------------------------------------------------
-        logging.info(f"Cleaning extraneous channels in category '{category.name}' (ID: {category.id}) for guild '{guild.name}'.")
+        logging.info("Cleaning extraneous channels in category '%s' (ID: %s) for guild '%s'.", category.name, category.id, guild.name)
         # Get a snapshot of channels in the category to iterate over
         channels_in_category = list(category.channels)
 
@@ -225,48 +343,39 @@ class GuildManagementCog(commands.Cog):
                       # This inner permission check is good practice even if guild-wide perm was held.
                       if channel.permissions_for(guild.me).manage_channels:
                           try:
-                              logging.info(f"Deleting extraneous channel '{channel.name}' (ID: {channel.id}) in category '{category.name}'.")
+                              logging.info("Deleting extraneous channel '%s' (ID: %s) in category '%s'.", channel.name, channel.id, category.name)
                               await channel.delete(reason="Cleanup of extraneous channel in GPT NETWORK category during setup.")
                               await asyncio.sleep(0.5) # Small delay to prevent rate limits
                           except Exception as e:
-                              logging.error(f"Failed to delete extraneous channel '{channel.name}' (ID: {channel.id}): {e}")
+                              logging.error("Failed to delete extraneous channel '%s' (ID: %s): %s", channel.name, channel.id, e)
                       else:
                            # This warning indicates a potential override issue even if guild-wide perm was held
-                           logging.warning(f"Bot lacks 'Manage Channels' permission for extraneous channel '{channel.name}' (ID: {channel.id}). Cannot delete.")
+                           logging.warning("Bot lacks 'Manage Channels' permission for extraneous channel '%s' (ID: %s). Cannot delete.", channel.name, channel.id)
                  else:
                       # Log that we are skipping channels with target names (optional, can be debug)
-                      logging.debug(f"Skipping deletion of channel '{channel.name}' (ID: {channel.id}) as it matches a target name.")
+                      logging.debug("Skipping deletion of channel '%s' (ID: %s) as it matches a target name.", channel.name, channel.id)
             else:
                  # Log that we are skipping non-text channels in the category (optional, can be debug)
-                 logging.debug(f"Skipping non-text channel '{channel.name}' (ID: {channel.id}) in category '{category.name}'.")
+                 logging.debug("Skipping non-text channel '%s' (ID: %s) in category '%s'.", channel.name, channel.id, category.name)
 
 
         # ----------------------------------------------------------------------
         # 2) Setup the #gpt-network channel (public read-only, no reactions)
         # ----------------------------------------------------------------------
         gpt_channel_overwrites = {
-            guild.default_role: discord.PermissionOverwrite(
-                view_channel=True,
-                read_message_history=True,
-                send_messages=False,
-                add_reactions=False
-            ),
-            bot_member: discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=True,
-                add_reactions=True,
-                read_message_history=True
-            )
+            guild.default_role: _PO_READ_ONLY,
+            bot_member: _PO_BOT
         }
         gpt_channel = await self._find_and_clean_specific_channel(
              guild,
              category,
              gpt_channel_name,
              gpt_channel_overwrites,
-             f"Ensuring '#{gpt_channel_name}' channel setup."
+             f"Ensuring '#{gpt_channel_name}' channel setup.",
+             text_channels_by_name
         )
         if not gpt_channel:
-             logging.error(f"Failed to setup '#{gpt_channel_name}' channel. Skipping remaining setup for guild '{guild.name}'.")
+             logging.error("Failed to setup '#%s' channel. Skipping remaining setup for guild '%s'.", gpt_channel_name, guild.name)
              # Keep return here as gpt_channel is essential for subsequent steps like invite and menu.
              return
 
@@ -275,7 +384,24 @@ class GuildManagementCog(commands.Cog):
         # 3) Create (or refresh) a permanent invite link for #gpt-network
         # ----------------------------------------------------------------------
         discord_invite_link = "" # Initialize with empty string
-        if gpt_channel: # Only try to create invite if channel exists
+        # A permanent invite stored for this same channel stays valid, so reuse it
+        # without any API call. A forced refresh probes it first and only re-issues on 404.
+        stored_invite_link = None
+        if gpt_channel and stored_data and stored_data.get("gpt_channel_id") == gpt_channel.id:
+            stored_invite_link = stored_data.get("discord_invite_link") or None
+        if stored_invite_link and force_refresh:
+            try:
+                await self.bot.fetch_invite(stored_invite_link, with_counts=False)
+            except discord.NotFound:
+                logging.info("Stored invite link for guild '%s' no longer exists. Re-issuing.", guild.name)
+                stored_invite_link = None
+            except Exception as e:
+                logging.warning("Could not verify stored invite link for guild '%s': %s. Keeping it.", guild.name, e)
+
+        if stored_invite_link:
+            discord_invite_link = stored_invite_link
+            logging.info("Reusing stored invite link for '#%s' (ID: %s): %s", gpt_channel_name, gpt_channel.id, discord_invite_link)
+        elif gpt_channel: # Only try to create invite if channel exists
             try:
                 # Find existing permanent invites created by the bot in this channel
                 existing_invites = await gpt_channel.invites()
@@ -285,24 +411,24 @@ class GuildManagementCog(commands.Cog):
                 if permanent_invites:
                     # Use the first permanent invite found
                     invite = permanent_invites[0]
-                    logging.info(f"Using existing permanent invite link for '#{gpt_channel_name}' (ID: {gpt_channel.id}): {invite.url}")
+                    logging.info("Using existing permanent invite link for '#%s' (ID: %s): %s", gpt_channel_name, gpt_channel.id, invite.url)
                 else:
                     # Create a new permanent invite
                     invite = await gpt_channel.create_invite(max_age=0, max_uses=0, unique=True, reason="Permanent invite for GPT Network channel.")
-                    logging.info(f"Created new permanent invite link for '#{gpt_channel_name}' (ID: {gpt_channel.id}): {invite.url}")
+                    logging.info("Created new permanent invite link for '#%s' (ID: %s): %s", gpt_channel_name, gpt_channel.id, invite.url)
 
                 discord_invite_link = invite.url
 
             except discord.Forbidden:
-                logging.warning(f"Bot lacks 'Create Instant Invite' permission in '{gpt_channel.name}' (ID: {gpt_channel.id}) in guild '{guild.name}'. Cannot create invite link.")
+                logging.warning("Bot lacks 'Create Instant Invite' permission in '%s' (ID: %s) in guild '%s'. Cannot create invite link.", gpt_channel.name, gpt_channel.id, guild.name)
             except Exception as e:
-                logging.error(f"Error creating/finding invite link for '#{gpt_channel_name}': {e}")
+                logging.error("Error creating/finding invite link for '#%s': %s", gpt_channel_name, e)
 
 
         # ----------------------------------------------------------------------
         # 4) Create (or retrieve) GPT STAT ACCESS role (use_application_commands = True)
         # ----------------------------------------------------------------------
-        gpt_stat_access_role = discord.utils.get(guild.roles, name="GPT STAT ACCESS")
+        gpt_stat_access_role = roles_by_name.get(GPT_STAT_ACCESS_ROLE_NAME)
         if not gpt_stat_access_role:
             try:
                 permissions = discord.Permissions.none()
@@ -313,12 +439,12 @@ class GuildManagementCog(commands.Cog):
                     permissions=permissions,
                     reason="Role for stats access, including slash commands."
                 )
-                logging.info(f"Created role 'GPT STAT ACCESS' (ID: {gpt_stat_access_role.id}) in guild '{guild.name}'.")
+                logging.info("Created role 'GPT STAT ACCESS' (ID: %s) in guild '%s'.", gpt_stat_access_role.id, guild.name)
             except Exception as e:
-                logging.error(f"Error creating role 'GPT STAT ACCESS' in guild '{guild.name}': {e}")
+                logging.error("Error creating role 'GPT STAT ACCESS' in guild '%s': %s", guild.name, e)
                 # Don't return here, other steps can potentially still succeed without the role
         else:
-            logging.info(f"Role 'GPT STAT ACCESS' (ID: {gpt_stat_access_role.id}) already exists in guild '{guild.name}'.")
+            logging.info("Role 'GPT STAT ACCESS' (ID: %s) already exists in guild '%s'.", gpt_stat_access_role.id, guild.name)
             # Ensure it has permission to use slash commands
             try:
                 current_perms = gpt_stat_access_role.permissions
@@ -331,18 +457,18 @@ class GuildManagementCog(commands.Cog):
                         reason="Enabling slash commands for GPT STAT ACCESS role"
                     )
                     logging.info(
-                        f"Updated GPT STAT ACCESS role (ID: {gpt_stat_access_role.id}) to allow use of slash commands in guild "
-                        f"'{guild.name}'."
+                        "Updated GPT STAT ACCESS role (ID: %s) to allow use of slash commands in guild "
+                        "'%s'.", gpt_stat_access_role.id, guild.name
                     )
             except Exception as e:
-                logging.error(f"Failed to set use_application_commands for GPT STAT ACCESS role (ID: {gpt_stat_access_role.id}) in guild '{guild.name}': {e}")
+                logging.error("Failed to set use_application_commands for GPT STAT ACCESS role (ID: %s) in guild '%s': %s", gpt_stat_access_role.id, guild.name, e)
 
 
         # ----------------------------------------------------------------------
         # Create (or retrieve) @SOS LFG role
         # Now includes color #faee10
         # ----------------------------------------------------------------------
-        sos_lfg_role = discord.utils.get(guild.roles, name=sos_lfg_role_name)
+        sos_lfg_role = roles_by_name.get(sos_lfg_role_name)
         if not sos_lfg_role:
             try:
                 # Role will have no specific permissions, just be mentionable
@@ -354,19 +480,19 @@ class GuildManagementCog(commands.Cog):
                     color=discord.Color(sos_lfg_role_color), # Set the color here
                     reason="Role for pinging users interested in SOS LFG."
                 )
-                logging.info(f"Created role '{sos_lfg_role_name}' (ID: {sos_lfg_role.id}) in guild '{guild.name}' with color {hex(sos_lfg_role_color)}.")
+                logging.info("Created role '%s' (ID: %s) in guild '%s' with color %s.", sos_lfg_role_name, sos_lfg_role.id, guild.name, hex(sos_lfg_role_color))
             except Exception as e:
-                logging.error(f"Error creating role '{sos_lfg_role_name}' in guild '{guild.name}': {e}")
+                logging.error("Error creating role '%s' in guild '%s': %s", sos_lfg_role_name, guild.name, e)
                 # Don't return, but sos_lfg_role might be None for the DB update
         else:
-             logging.info(f"Role '{sos_lfg_role_name}' (ID: {sos_lfg_role.id}) already exists in guild '{guild.name}'.")
+             logging.info("Role '%s' (ID: %s) already exists in guild '%s'.", sos_lfg_role_name, sos_lfg_role.id, guild.name)
              # Optional: Update the color if it's not correct
              if sos_lfg_role.color != discord.Color(sos_lfg_role_color):
                  try:
                      await sos_lfg_role.edit(color=discord.Color(sos_lfg_role_color), reason=f"Updating color for {sos_lfg_role_name} role.")
-                     logging.info(f"Updated color for role '{sos_lfg_role_name}' (ID: {sos_lfg_role.id}) to {hex(sos_lfg_role_color)} in guild '{guild.name}'.")
+                     logging.info("Updated color for role '%s' (ID: %s) to %s in guild '%s'.", sos_lfg_role_name, sos_lfg_role.id, hex(sos_lfg_role_color), guild.name)
                  except Exception as e:
-                      logging.error(f"Failed to update color for role '{sos_lfg_role_name}' (ID: {sos_lfg_role.id}) in guild '{guild.name}': {e}")
+                      logging.error("Failed to update color for role '%s' (ID: %s) in guild '%s': %s", sos_lfg_role_name, sos_lfg_role.id, guild.name, e)
 
 
         # ----------------------------------------------------------------------
@@ -374,33 +500,18 @@ class GuildManagementCog(commands.Cog):
         # ----------------------------------------------------------------------
         # Define overwrites. Need to handle the case where gpt_stat_access_role might be None.
         monitor_overwrites = {
-            guild.default_role: discord.PermissionOverwrite(
-                view_channel=False, # Hidden from @everyone by default
-                read_message_history=False,
-                send_messages=False,
-                add_reactions=False
-            ),
-            bot_member: discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=True,
-                add_reactions=True,
-                read_message_history=True
-            )
+            guild.default_role: _PO_HIDDEN_DEFAULT,
+            bot_member: _PO_BOT
         }
         # Add overwrite for the GPT STAT ACCESS role if it exists
         if gpt_stat_access_role:
-             monitor_overwrites[gpt_stat_access_role] = discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=False, # Members with this role can see but not send
-                add_reactions=False,
-                read_message_history=True
-             )
+             # Members with this role can see but not send
+             monitor_overwrites[gpt_stat_access_role] = _PO_READ_ONLY
 
         # Add overwrite for the SOS LFG role - typically they shouldn't see monitor
         if sos_lfg_role:
-             monitor_overwrites[sos_lfg_role] = discord.PermissionOverwrite(
-                view_channel=False # Ensure SOS LFG role cannot see monitor channel
-             )
+             # Ensure SOS LFG role cannot see monitor channel
+             monitor_overwrites[sos_lfg_role] = _PO_HIDDEN
 
 
         monitor_channel = await self._find_and_clean_specific_channel(
@@ -408,38 +519,24 @@ class GuildManagementCog(commands.Cog):
              category,
              monitor_channel_name,
              monitor_overwrites,
-             f"Ensuring '#{monitor_channel_name}' channel setup."
+             f"Ensuring '#{monitor_channel_name}' channel setup.",
+             text_channels_by_name
         )
         # Monitor channel is not critical for the bot's core function, so we don't return if it fails
         if not monitor_channel:
-            logging.warning(f"Failed to setup '#{monitor_channel_name}' channel in guild '{guild.name}'.")
+            logging.warning("Failed to setup '#%s' channel in guild '%s'.", monitor_channel_name, guild.name)
 
 
         # ----------------------------------------------------------------------
         # 6) Setup #leaderboard (read-only to everyone except bot)
         # ----------------------------------------------------------------------
         leaderboard_overwrites = {
-            guild.default_role: discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=False, # Everyone can see, but not send
-                add_reactions=False,
-                read_message_history=True # Allow reading history for everyone
-            ),
-            bot_member: discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=True, # Bot can send messages
-                add_reactions=True, # Bot can react
-                read_message_history=True
-            )
+            guild.default_role: _PO_READ_ONLY, # Everyone can see, but not send
+            bot_member: _PO_BOT # Bot can send messages and react
         }
         # Add overwrite for the SOS LFG role - typically they should see the leaderboard
         if sos_lfg_role:
-             leaderboard_overwrites[sos_lfg_role] = discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=False, # Can see but not send messages
-                add_reactions=False,
-                read_message_history=True
-             )
+             leaderboard_overwrites[sos_lfg_role] = _PO_READ_ONLY
 
 
         leaderboard_channel = await self._find_and_clean_specific_channel(
@@ -447,11 +544,32 @@ class GuildManagementCog(commands.Cog):
              category,
              leaderboard_channel_name,
              leaderboard_overwrites,
-             f"Ensuring '#{leaderboard_channel_name}' channel setup."
+             f"Ensuring '#{leaderboard_channel_name}' channel setup.",
+             text_channels_by_name
         )
          # Leaderboard channel is also not strictly critical, don't return if it fails
         if not leaderboard_channel:
-            logging.warning(f"Failed to setup '#{leaderboard_channel_name}' channel in guild '{guild.name}'.")
+            logging.warning("Failed to setup '#%s' channel in guild '%s'.", leaderboard_channel_name, guild.name)
+
+
+        # Fingerprint the desired state, but only once everything was set up, so a
+        # partially failed setup is retried on the next run instead of skipped.
+        config_fp = None
+        if monitor_channel and leaderboard_channel and gpt_stat_access_role and sos_lfg_role:
+            config_fp = _config_fingerprint(
+                guild.name,
+                [category.id, _overwrites_key(category_overwrites)],
+                {
+                    gpt_channel_name: [[gpt_channel.id, category.id, _overwrites_key(gpt_channel_overwrites)]],
+                    monitor_channel_name: [[monitor_channel.id, category.id, _overwrites_key(monitor_overwrites)]],
+                    leaderboard_channel_name: [[leaderboard_channel.id, category.id, _overwrites_key(leaderboard_overwrites)]],
+                },
+                [],
+                {
+                    GPT_STAT_ACCESS_ROLE_NAME: [gpt_stat_access_role.id, True],
+                    sos_lfg_role_name: [sos_lfg_role.id, sos_lfg_role_color],
+                }
+            )
 
 
         # ----------------------------------------------------------------------
@@ -468,6 +586,7 @@ class GuildManagementCog(commands.Cog):
             "sos_lfg_role_id": sos_lfg_role.id if sos_lfg_role else None, # Store the SOS LFG Role ID
             "monitor_channel_id": monitor_channel.id if monitor_channel else None,
             "leaderboard_channel_id": leaderboard_channel.id if leaderboard_channel else None,
+            "config_fp": config_fp,
         }
 
         try:
@@ -476,9 +595,10 @@ class GuildManagementCog(commands.Cog):
                 {"$set": update_data},
                 upsert=True
             )
-            logging.info(f"Upserted server data (channels, role IDs) for guild '{guild.name}'.")
+            update_cached_server_data(self.bot, guild.id, update_data)
+            logging.info("Upserted server data (channels, role IDs) for guild '%s'.", guild.name)
         except Exception as e:
-            logging.error(f"Error updating server listing for '{guild.name}': {e}")
+            logging.error("Error updating server listing for '%s': %s", guild.name, e)
 
         # ----------------------------------------------------------------------
         # 8) Optionally refresh the SOS menu in #gpt-network (original logic)
@@ -487,22 +607,71 @@ class GuildManagementCog(commands.Cog):
         if gpt_channel:
              await self.refresh_sos_menu(guild, force_refresh)
         else:
-             logging.warning(f"Skipping SOS menu refresh for guild '{guild.name}' because gpt_channel was not set up.")
+             logging.warning("Skipping SOS menu refresh for guild '%s' because gpt_channel was not set up.", guild.name)
+
+
+    def _live_config_fingerprint(self, guild, text_channels_by_name, categories_by_name, roles_by_name):
+        """
+        Builds the setup_guild config fingerprint from the guild's current state.
+        Returns None if the category doesn't exist yet.
+        """
+        category = categories_by_name.get(CATEGORY_NAME)
+        if not category:
+            return None
+        gpt_stat_access_role = roles_by_name.get(GPT_STAT_ACCESS_ROLE_NAME)
+        sos_lfg_role = roles_by_name.get(SOS_LFG_ROLE_NAME)
+        return _config_fingerprint(
+            guild.name,
+            [category.id, _overwrites_key(category.overwrites)],
+            {
+                name: [[c.id, c.category_id, _overwrites_key(c.overwrites)] for c in text_channels_by_name.get(name, ())]
+                for name in TARGET_CHANNEL_NAMES
+            },
+            sorted(c.name for c in category.text_channels if c.name not in TARGET_CHANNEL_NAMES),
+            {
+                GPT_STAT_ACCESS_ROLE_NAME: [gpt_stat_access_role.id, gpt_stat_access_role.permissions.use_application_commands] if gpt_stat_access_role else None,
+                SOS_LFG_ROLE_NAME: [sos_lfg_role.id, sos_lfg_role.color.value] if sos_lfg_role else None,
+            }
+        )
+
+
+    async def _sos_menu_is_current(self, gpt_channel, server_data, menu_view_cog):
+        """
+        True if the stored menu message still exists and was built from the same
+        content the menu would be built from now (compared by content hash).
+        """
+        menu_message_id = server_data.get("menu_message_id")
+        stored_hash = server_data.get("menu_hash")
+        if not menu_message_id or not stored_hash:
+            return False
+        try:
+            embed = await menu_view_cog.build_sos_menu_embed()
+            if menu_view_cog.sos_menu_hash(embed) != stored_hash:
+                return False
+            # Make sure nobody deleted the menu since it was posted
+            await gpt_channel.fetch_message(menu_message_id)
+            return True
+        except discord.NotFound:
+            return False
+        except Exception as e:
+            logging.error("Error checking current SOS menu in '%s': %s", gpt_channel.name, e)
+            return False
 
 
     async def refresh_sos_menu(self, guild, force_refresh=False):
         """
-        Refresh the SOS menu in the gpt-network channel of the specified guild.
+        Refresh the SOS menu in the gpt-network channel of the specified guild:
+        delete the old bot menu/SOS messages and send a new menu. Without
+        force_refresh, the refresh is skipped if the posted menu is unchanged.
         """
         menu_view_cog = self.bot.get_cog("MenuViewCog")
         if not menu_view_cog:
             logging.warning("MenuViewCog is not loaded. Cannot refresh SOS menu.")
             return
 
-        server_listing = self.bot.mongo_db['Server_Listing']
-        server_data = await server_listing.find_one({"discord_server_id": guild.id})
+        server_data = await get_server_data(self.bot, guild.id)
         if not server_data:
-            logging.warning(f"Server data for guild '{guild.name}' not found. Cannot refresh SOS menu.")
+            logging.warning("Server data for guild '%s' not found. Cannot refresh SOS menu.", guild.name)
             return
 
         # Use the channel ID from the database
@@ -511,8 +680,8 @@ class GuildManagementCog(commands.Cog):
 
         if not gpt_channel or not isinstance(gpt_channel, discord.TextChannel):
             logging.warning(
-                f"GPT channel for guild '{guild.name}' not found or not a TextChannel. "
-                f"Channel ID from DB: {gpt_channel_id}. Cannot refresh SOS menu."
+                "GPT channel for guild '%s' not found or not a TextChannel. "
+                "Channel ID from DB: %s. Cannot refresh SOS menu.", guild.name, gpt_channel_id
             )
             return
 
@@ -522,46 +691,60 @@ class GuildManagementCog(commands.Cog):
         can_send_messages = gpt_channel.permissions_for(guild.me).send_messages
 
 
-        if force_refresh:
-            if not can_manage_messages or not can_read_history:
-                 logging.warning(
-                     f"Bot lacks 'Manage Messages' or 'Read Message History' permission in '{gpt_channel.name}' (ID: {gpt_channel.id}). "
-                     f"Skipping old bot message deletion during menu refresh."
-                 )
-            else:
+        # Unless forced, leave the posted menu alone when its content hasn't changed
+        if not force_refresh and await self._sos_menu_is_current(gpt_channel, server_data, menu_view_cog):
+            logging.info("SOS menu in '%s' in guild '%s' is unchanged. Skipping refresh.", gpt_channel.name, guild.name)
+            return
+
+        # The menu is being resent, so remove the old one first
+        if not can_manage_messages or not can_read_history:
+             logging.warning(
+                 "Bot lacks 'Manage Messages' or 'Read Message History' permission in '%s' (ID: %s). "
+                 "Skipping old bot message deletion during menu refresh.", gpt_channel.name, gpt_channel.id
+             )
+        else:
+             # Delete the previous menu directly by its stored ID; only fall back to
+             # scanning the channel history when no ID is stored or it's already gone.
+             menu_message_id = server_data.get("menu_message_id")
+             deleted_by_id = False
+             if menu_message_id:
                  try:
-                     deleted_count = 0
-                     # Limit history to avoid excessive fetching
-                     async for message in gpt_channel.history(limit=50):
-                         if message.author == self.bot.user and message.embeds:
-                             embed = message.embeds[0]
-                             # Check for SOS or menu embed by title
-                             if embed.title in ["SOS ACTIVATED", "Welcome to the SOS Alliance Network!"]:
-                                 try:
-                                     logging.info(f"Deleting old bot message in '{guild.name}' channel '{gpt_channel.name}' (Message ID: {message.id}, Title: '{embed.title}').")
-                                     await message.delete()
-                                     deleted_count += 1
-                                     # Avoid deleting too many messages at once if there's an issue
-                                     # await asyncio.sleep(0.5)
-                                 except Exception as delete_error:
-                                     logging.error(f"Error deleting message {message.id} in '{gpt_channel.name}' in guild '{guild.name}': {delete_error}")
+                     await self.bot.http.delete_message(gpt_channel.id, menu_message_id, reason="Refreshing SOS menu.")
+                     deleted_by_id = True
+                     logging.info("Deleted previous SOS menu message (ID: %s) in '%s' in guild '%s'.", menu_message_id, gpt_channel.name, guild.name)
+                 except discord.NotFound:
+                     logging.info("Stored SOS menu message (ID: %s) not found in guild '%s'. Scanning history instead.", menu_message_id, guild.name)
+                 except Exception as e:
+                     logging.error("Error deleting stored SOS menu message (ID: %s) in guild '%s': %s", menu_message_id, guild.name, e)
 
+             if not deleted_by_id:
+                 try:
+                     # Only the previous menu (plus at most one stray) is expected near the
+                     # bottom of the channel, so scan a short page and stop once found
+                     deleted = await purge_bot_messages(
+                         gpt_channel,
+                         is_sos_or_menu_message,
+                         limit=REFRESH_HISTORY_LIMIT,
+                         max_count=REFRESH_MAX_STALE_MESSAGES,
+                         reason="Refreshing SOS menu."
+                     )
+                     deleted_count = len(deleted)
                      if deleted_count > 0:
-                         logging.info(f"Finished cleaning old messages in '{gpt_channel.name}' in guild '{guild.name}'. Deleted {deleted_count} messages.")
+                         logging.info("Finished cleaning old messages in '%s' in guild '%s'. Deleted %s messages.", gpt_channel.name, guild.name, deleted_count)
                  except Exception as e:
-                     logging.error(f"Error fetching message history for cleanup in '{gpt_channel.name}' in guild '{guild.name}': {e}")
+                     logging.error("Error fetching message history for cleanup in '%s' in guild '%s': %s", gpt_channel.name, guild.name, e)
 
 
         if not can_send_messages:
-             logging.warning(f"Bot lacks 'Send Messages' permission in '{gpt_channel.name}' (ID: {gpt_channel.id}) in guild '{guild.name}'. Cannot send SOS menu.")
+             logging.warning("Bot lacks 'Send Messages' permission in '%s' (ID: %s) in guild '%s'. Cannot send SOS menu.", gpt_channel.name, gpt_channel.id, guild.name)
              return
 
         try:
              # menu_view_cog.send_sos_menu_to_guild should handle sending the message
              await menu_view_cog.send_sos_menu_to_guild(guild)
-             logging.info(f"Sent SOS menu to '{guild.name}'.")
+             logging.info("Sent SOS menu to '%s'.", guild.name)
         except Exception as e:
-            logging.error(f"Error sending SOS menu to '{guild.name}': {e}")
+            logging.error("Error sending SOS menu to '%s': %s", guild.name, e)
 
 
     async def _leave_unknown_guilds(self):
@@ -572,73 +755,57 @@ class GuildManagementCog(commands.Cog):
         try:
             server_listing = self.bot.mongo_db['Server_Listing']
             # Get a list of known guild IDs from the database
-            known_guild_ids_cursor = server_listing.find({}, {"discord_server_id": 1})
-            known_guild_ids = set([doc["discord_server_id"] for doc in await known_guild_ids_cursor.to_list(None)])
+            # Streamed straight into the set rather than buffering every document first
+            known_guild_ids_cursor = server_listing.find({}, {"discord_server_id": 1, "_id": 0})
+            known_guild_ids = {doc["discord_server_id"] async for doc in known_guild_ids_cursor if "discord_server_id" in doc}
 
             # Iterate through currently connected guilds
             for guild in list(self.bot.guilds): # Iterate over a copy in case we leave a guild
                 if guild.id not in known_guild_ids:
-                    logging.warning(f"Bot is in unknown guild: {guild.name} (ID: {guild.id}). Leaving guild.")
+                    logging.warning("Bot is in unknown guild: %s (ID: %s). Leaving guild.", guild.name, guild.id)
                     try:
                         await guild.leave()
-                        logging.info(f"Successfully left guild: {guild.name} (ID: {guild.id}).")
+                        logging.info("Successfully left guild: %s (ID: %s).", guild.name, guild.id)
                     except discord.Forbidden:
-                        logging.error(f"Forbidden from leaving guild: {guild.name} (ID: {guild.id}). Check bot permissions.")
+                        logging.error("Forbidden from leaving guild: %s (ID: %s). Check bot permissions.", guild.name, guild.id)
                     except Exception as e:
-                        logging.error(f"Error leaving guild {guild.name} (ID: {guild.id}): {e}")
+                        logging.error("Error leaving guild %s (ID: %s): %s", guild.name, guild.id, e)
                 else:
-                    logging.debug(f"Guild {guild.name} (ID: {guild.id}) is a known guild. Staying.")
+                    logging.debug("Guild %s (ID: %s) is a known guild. Staying.", guild.name, guild.id)
 
         except Exception as e:
-            logging.error(f"Error during unknown guild check: {e}")
+            logging.error("Error during unknown guild check: %s", e)
 
     @commands.Cog.listener()
     async def on_ready(self):
         logging.info("GuildManagementCog is ready.")
-        # The previous issue was that on_ready running setup_guild every time
-        # caused channel duplicates because the old ones weren't cleaned up.
-        # With the new cleanup logic in setup_guild, running it on_ready
-        # is now the intended behavior to ensure the guild state is correct on boot.
 
         logging.info("Starting guild setup for all joined guilds on startup.")
         # Define the list of allowed guild IDs
         allowed_guild_ids = [1172948128509468742, 1221490168670715936, 1214787549655203862]
 
-        for guild in self.bot.guilds:
-            logging.info(f"Checking setup for guild: {guild.name} (ID: {guild.id})")
-            if guild.id in allowed_guild_ids:
+        # Guild setups are independent, so run them concurrently; the semaphore bounds
+        # how many are in flight to stay clear of Discord's global rate limit.
+        semaphore = asyncio.Semaphore(SETUP_CONCURRENCY)
+
+        async def setup_one(guild):
+            async with semaphore:
                 try:
-                    # force_refresh=True here will ensure old bot messages are deleted from the SOS channel
-                    # and the menu is resent, besides performing channel/role setup/cleanup.
-                    await self.setup_guild(guild, force_refresh=True)
+                    # On boot the menu is only resent when its hash changed or the stored
+                    # menu message is gone.
+                    await self.setup_guild(guild, force_refresh=False)
                 except Exception as e:
-                    logging.error(f"Error setting up guild '{guild.name}': {e}")
-            else:
-                logging.info(f"Skipping setup for guild: {guild.name} (ID: {guild.id}) - Not in the allowed list.")
-
-        # After setting up known guilds, check and leave unknown ones
-        await self._leave_unknown_guilds()
-        logging.info("GuildManagementCog is ready.")
-        # The previous issue was that on_ready running setup_guild every time
-        # caused channel duplicates because the old ones weren't cleaned up.
-        # With the new cleanup logic in setup_guild, running it on_ready
-        # is now the intended behavior to ensure the guild state is correct on boot.
-
-        logging.info("Starting guild setup for all joined guilds on startup.")
-        # Define the list of allowed guild IDs
-        allowed_guild_ids = [1172948128509468742, 1221490168670715936, 1214787549655203862]
+                    logging.error("Error setting up guild '%s': %s", guild.name, e)
 
+        guilds_to_setup = []
         for guild in self.bot.guilds:
-            logging.info(f"Checking setup for guild: {guild.name} (ID: {guild.id})")
+            logging.info("Checking setup for guild: %s (ID: %s)", guild.name, guild.id)
             if guild.id in allowed_guild_ids:
-                try:
-                    # force_refresh=True here will ensure old bot messages are deleted from the SOS channel
-                    # and the menu is resent, besides performing channel/role setup/cleanup.
-                    await self.setup_guild(guild, force_refresh=True)
-                except Exception as e:
-                    logging.error(f"Error setting up guild '{guild.name}': {e}")
+                guilds_to_setup.append(guild)
             else:
-                logging.info(f"Skipping setup for guild: {guild.name} (ID: {guild.id}) - Not in the allowed list.")
+                logging.info("Skipping setup for guild: %s (ID: %s) - Not in the allowed list.", guild.name, guild.id)
+
+        await asyncio.gather(*(setup_one(guild) for guild in guilds_to_setup), return_exceptions=True)
 
         # After setting up known guilds, check and leave unknown ones
         await self._leave_unknown_guilds()
@@ -648,12 +815,12 @@ class GuildManagementCog(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
         """When the bot joins a new guild, set up the guild immediately."""
-        logging.info(f"Joined new guild: {guild.name} (ID: {guild.id})")
+        logging.info("Joined new guild: %s (ID: %s)", guild.name, guild.id)
         try:
             # force_refresh=True is fine for a new guild, it just means send the menu.
             await self.setup_guild(guild, force_refresh=True)
         except Exception as e:
-            logging.error(f"Error setting up new guild '{guild.name}': {e}")
+            logging.error("Error setting up new guild '%s': %s", guild.name, e)
 
 
 async def setup(bot):
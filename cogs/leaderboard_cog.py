@@ -1,74 +1,280 @@
 import os
+import io
 import logging
 import discord
 from discord.ext import commands, tasks
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-from collections import defaultdict
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+import random
+from cogs.message_utils import purge_bot_messages
 
 CATEGORY_NAME = "GPT NETWORK"
 LEADERBOARD_CHANNEL_NAME = "❗｜leaderboard"
 LEADERBOARD_IMAGE_PATH = "sos_leaderboard.png"
 MIN_GAMES_PLAYED = 3
+# Hours between leaderboard updates
+LEADERBOARD_UPDATE_HOURS = 8
+LEADERBOARD_FOOTER = f"Leaderboard updates every {LEADERBOARD_UPDATE_HOURS} hours. Minimum {MIN_GAMES_PLAYED} games required."
+# Filled with the current month, e.g. "JULY 2025", so the title rolls over by itself
+LEADERBOARD_TITLE = "**GPT {month} LEADERBOARD**"
+# Seconds the Alliance server-name map is reused across leaderboard updates
+SERVER_MAP_TTL = 3600
+# Maximum random delay (seconds) before the first leaderboard update
+LEADERBOARD_START_JITTER = 600
+# Seconds a stored leaderboard is reused after a restart. Kept just under the update
+# interval, so every scheduled tick recomputes.
+LEADERBOARD_CACHE_TTL = LEADERBOARD_UPDATE_HOURS * 3600 - 1800
+# Leaderboard rows fetched per cursor round trip
+LEADERBOARD_BATCH_SIZE = 1000
+# Maximum number of guilds posting the leaderboard concurrently
+LEADERBOARD_CONCURRENCY = 8
+
+# Per-player embed field body; filled from a LeaderboardEntry bound to `p`
+LEADERBOARD_FIELD_TEMPLATE = (
+    "**Clan:** {p.clan}\n"
+    "**Melee Kills:** {p.melee_kills}\n"
+    "**Kills:** {p.kills}\n"
+    "**Deaths:** {p.deaths}\n"
+    "**Accuracy:** {p.accuracy:.1f}%\n"
+    "**Shots Hit:** {p.shots_hit}\n"
+    "**Shots Fired:** {p.shots_fired}\n"
+    "*Games: {p.games_played}*"
+)
+# Rank prefixes indexed by rank; only the top three get a medal
+RANK_EMOJIS = ("", "🥇 ", "🥈 ", "🥉 ")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+
+@dataclass(slots=True)
+class LeaderboardEntry:
+    """One player's totals on the leaderboard, as returned by the aggregation."""
+    player_name: str
+    melee_kills: int
+    kills: int
+    deaths: int
+    shots_fired: int
+    shots_hit: int
+    games_played: int
+    accuracy: float
+    clan: str = "Unknown Clan"
+
+
+def _month_key():
+    """Current UTC month as YYYY-MM; keys the Leaderboard_Cache documents."""
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+def _leaderboard_title():
+    """Embed title for the current UTC month."""
+    return LEADERBOARD_TITLE.format(month=datetime.now(timezone.utc).strftime("%B %Y").upper())
+
+
+def _to_int(field):
+    """Aggregation expression for a stat field as a 64-bit int, 0 if missing or not numeric."""
+    return {"$convert": {"input": f"${field}", "to": "long", "onError": 0, "onNull": 0}}
+
+
+def _leaderboard_pipeline():
+    """
+    User_Stats aggregation: totals per player, players with fewer than
+    MIN_GAMES_PLAYED games dropped, sorted by best accuracy. Each result keeps
+    the server ID (as a string) of every game the player submitted, oldest
+    first, for the clan lookup.
+    """
+    return [
+        {"$match": {"player_name": {"$nin": [None, ""]}}},
+        # Games enter $group oldest first, so server_ids has a defined order
+        {"$sort": {"_id": 1}},
+        # Only the fields the leaderboard reads
+        {"$project": {
+            "_id": 0, "player_name": 1, "discord_server_id": 1, "Melee Kills": 1,
+            "Kills": 1, "Deaths": 1, "Shots Fired": 1, "Shots Hit": 1,
+        }},
+        {"$group": {
+            "_id": "$player_name",
+            "melee_kills": {"$sum": _to_int("Melee Kills")},
+            "kills": {"$sum": _to_int("Kills")},
+            "deaths": {"$sum": _to_int("Deaths")},
+            "shots_fired": {"$sum": _to_int("Shots Fired")},
+            "shots_hit": {"$sum": _to_int("Shots Hit")},
+            "games_played": {"$sum": 1},
+            # Server IDs may be stored as int or string, so collect their string form
+            "server_ids": {"$push": {"$toString": "$discord_server_id"}},
+        }},
+        {"$match": {"games_played": {"$gte": MIN_GAMES_PLAYED}}},
+        {"$addFields": {
+            "player_name": "$_id",
+            "accuracy": {"$cond": [
+                {"$gt": ["$shots_fired", 0]},
+                {"$multiply": [{"$divide": ["$shots_hit", "$shots_fired"]}, 100]},
+                0.0,
+            ]},
+        }},
+        # Ties are broken by player name, so equal accuracies rank the same on every run
+        {"$sort": {"accuracy": -1, "_id": 1}},
+        {"$project": {"_id": 0}},
+    ]
+
+
 class LeaderboardCog(commands.Cog):
     """
-    June 2025: Best Melee Kills (shows all stats).
+    Posts the monthly leaderboard (best accuracy, all stats shown) to every
+    guild's leaderboard channel every LEADERBOARD_UPDATE_HOURS hours.
     """
 
     def __init__(self, bot):
         self.bot = bot
-        self.leaderboard_lock = asyncio.Lock()
+        # Reuse the bot's shared Mongo client instead of connecting per update
+        self.db = bot.mongo_db
+        self.stats_collection = self.db['User_Stats']
+        self.alliance_collection = self.db['Alliance']
+        # Last computed leaderboard per month, so a restart doesn't force a recompute
+        self.leaderboard_cache_collection = self.db['Leaderboard_Cache']
+        # Alliance server ID (as str) -> clan name, refreshed every SERVER_MAP_TTL seconds
+        self._server_map = {}
+        self._server_map_ts = None
+        # Guild ID -> leaderboard channel ID, so later ticks skip the channel scans
+        self._leaderboard_channel_ids = {}
+        self.post_semaphore = asyncio.Semaphore(LEADERBOARD_CONCURRENCY)
         self.update_leaderboard_task.start()
 
     def cog_unload(self):
         self.update_leaderboard_task.cancel()
 
-    @tasks.loop(hours=8)
+    async def cog_load(self):
+        """
+        Index the leaderboard's grouping/join keys. The player_name-prefixed index
+        also serves plain player_name lookups. Idempotent.
+        """
+        indexes = (
+            (self.stats_collection, [("player_name", 1), ("discord_server_id", 1)], {}),
+            (self.stats_collection, [("discord_server_id", 1), ("player_name", 1)], {}),
+            # Alliance holds one registration per user, so many documents share a server ID
+            (self.alliance_collection, [("discord_server_id", 1)], {}),
+        )
+        for collection, keys, options in indexes:
+            try:
+                await collection.create_index(keys, **options)
+            except Exception as e:
+                # Queries still work unindexed
+                logger.error("Failed to create index %s on %s: %s", keys, collection.name, e)
+
+    @tasks.loop(hours=LEADERBOARD_UPDATE_HOURS)
     async def update_leaderboard_task(self):
-        async with self.leaderboard_lock:
-            leaderboard_data = await self.calculate_leaderboard_data()
-            embeds, image_path = await self.build_leaderboard_embeds(leaderboard_data)
-            for guild in self.bot.guilds:
-                channel = await self.ensure_leaderboard_channel(guild)
-                if not channel:
-                    continue
-                if channel.permissions_for(guild.me).manage_messages:
-                    async for msg in channel.history(limit=20):
-                        if msg.author == self.bot.user:
-                            try:
-                                await msg.delete()
-                                await asyncio.sleep(0.6)
-                            except Exception:
-                                pass
-                if not embeds:
-                    embed = discord.Embed(
-                        title="**GPT JULY 2025 LEADERBOARD**",
-                        description=f"No leaderboard data available.\nPlayers must submit at least ({MIN_GAMES_PLAYED}) games to appear!",
-                        color=discord.Color.blue()
-                    )
-                    file = discord.File(image_path, filename=os.path.basename(image_path)) if image_path else None
-                    if file:
-                        embed.set_image(url=f"attachment://{os.path.basename(image_path)}")
-                    await channel.send(embed=embed, file=file if file else discord.utils.MISSING)
-                else:
-                    for idx, embed in enumerate(embeds):
-                        file = None
-                        if image_path and idx == 0:
-                            file = discord.File(image_path, filename=os.path.basename(image_path))
-                        await channel.send(embed=embed, file=file if file else discord.utils.MISSING)
-                        await asyncio.sleep(1.1)
+        # tasks.loop never overlaps its own iterations, so no lock is needed here
+        # The Mongo aggregation runs while the leaderboard channels are resolved
+        data_task = asyncio.create_task(self.calculate_leaderboard_data())
+        guilds = list(self.bot.guilds)
+        channels = await asyncio.gather(
+            *(self.ensure_leaderboard_channel(guild) for guild in guilds),
+            return_exceptions=True
+        )
+        targets = [
+            (guild, channel) for guild, channel in zip(guilds, channels)
+            if isinstance(channel, discord.TextChannel)
+        ]
+        if not targets:
+            # No guild can receive the leaderboard, so don't finish the Mongo work
+            data_task.cancel()
+            logger.warning("No guild has a usable leaderboard channel. Skipping leaderboard update.")
+            return
+
+        leaderboard_data = await data_task
+        embeds, image_path = await self.build_leaderboard_embeds(leaderboard_data)
+
+        # Read the image once; every guild's upload wraps the same bytes
+        image = None
+        if image_path:
+            try:
+                with open(image_path, 'rb') as f:
+                    image = (os.path.basename(image_path), f.read())
+            except OSError as e:
+                logger.error("Error reading leaderboard image '%s': %s", image_path, e)
+
+        # Guilds are updated concurrently; each guild's pages are still sent in order
+        results = await asyncio.gather(
+            *(self._post_leaderboard(guild, channel, embeds, image) for guild, channel in targets),
+            return_exceptions=True
+        )
+        for (guild, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error("Error posting leaderboard in guild '%s': %s", guild.name, result)
 
     @update_leaderboard_task.before_loop
     async def before_update_leaderboard_task(self):
         await self.bot.wait_until_ready()
+        # Spread the first (and so every later) run over a window, so restarted
+        # replicas don't all post at the same moment
+        await asyncio.sleep(random.uniform(0, LEADERBOARD_START_JITTER))
+
+    async def _post_leaderboard(self, guild: discord.Guild, channel: discord.TextChannel, embeds, image):
+        """
+        Replaces the leaderboard in one guild's leaderboard channel. `image` is
+        an optional (filename, bytes) pair attached to the first page. At most
+        LEADERBOARD_CONCURRENCY guilds post at once.
+        """
+        async with self.post_semaphore:
+            # Resolve the bot's channel permissions once for the whole post
+            perms = channel.permissions_for(guild.me)
+            can_attach = perms.attach_files
+            if perms.manage_messages:
+                # Remove the previous leaderboard in one bulk-delete request
+                try:
+                    await purge_bot_messages(
+                        channel,
+                        lambda msg: bool(msg.embeds or msg.attachments),
+                        limit=20,
+                        reason="Refreshing leaderboard."
+                    )
+                except Exception as e:
+                    logger.error("Error clearing old leaderboard in guild '%s': %s", guild.name, e)
+            # Pages go out back to back; discord.py's HTTP client waits out the
+            # channel's rate-limit bucket when it's exhausted
+            for idx, embed in enumerate(embeds):
+                file = None
+                if idx == 0 and embed.image.url:
+                    if image and can_attach:
+                        # A File's buffer is consumed on send, so each upload gets a fresh one
+                        file = discord.File(io.BytesIO(image[1]), filename=image[0])
+                    else:
+                        # Without the attachment the image would point at nothing; the embeds
+                        # are shared across guilds, so drop it from a copy
+                        embed = embed.copy()
+                        embed.set_image(url=None)
+                await channel.send(embed=embed, file=file if file else discord.utils.MISSING)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        if self._leaderboard_channel_ids.get(channel.guild.id) == channel.id:
+            self._leaderboard_channel_ids.pop(channel.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        # A renamed or re-permissioned channel is re-resolved on the next update
+        if self._leaderboard_channel_ids.get(after.guild.id) == after.id:
+            self._leaderboard_channel_ids.pop(after.guild.id, None)
 
     async def ensure_leaderboard_channel(self, guild: discord.Guild):
+        # Fast path: the channel found/created on an earlier tick, resolved by ID
+        cached_id = self._leaderboard_channel_ids.get(guild.id)
+        if cached_id:
+            channel = self.bot.get_channel(cached_id)
+            if (
+                isinstance(channel, discord.TextChannel)
+                and channel.guild.id == guild.id
+                and channel.name == LEADERBOARD_CHANNEL_NAME
+                and channel.permissions_for(guild.me).send_messages
+            ):
+                return channel
+            self._leaderboard_channel_ids.pop(guild.id, None)
+
         channel = discord.utils.get(guild.text_channels, name=LEADERBOARD_CHANNEL_NAME)
         if channel and channel.permissions_for(guild.me).send_messages:
+            self._leaderboard_channel_ids[guild.id] = channel.id
             return channel
         try:
             category = discord.utils.get(guild.categories, name=CATEGORY_NAME)
@@ -81,114 +287,115 @@ class LeaderboardCog(commands.Cog):
                 }
                 channel = await guild.create_text_channel(
                     LEADERBOARD_CHANNEL_NAME, category=category, overwrites=overwrites)
+                self._leaderboard_channel_ids[guild.id] = channel.id
             return channel
         except Exception:
             return None
 
+    async def get_server_map(self):
+        """
+        Returns the Alliance server-ID -> clan-name map. The Alliance collection
+        rarely changes, so it is only re-read once SERVER_MAP_TTL has passed.
+        """
+        now = time.monotonic()
+        if self._server_map_ts is None or now - self._server_map_ts >= SERVER_MAP_TTL:
+            server_map = {}
+            async for s in self.alliance_collection.find({}, {"_id": 0, "discord_server_id": 1, "server_name": 1}):
+                if 'discord_server_id' in s and 'server_name' in s:
+                    server_map[str(s['discord_server_id'])] = s['server_name']
+            self._server_map = server_map
+            self._server_map_ts = now
+        return self._server_map
+
     async def calculate_leaderboard_data(self):
-        mongo_uri = os.getenv('MONGODB_URI')
-        if not mongo_uri:
-            return []
+        """
+        Returns the sorted leaderboard. After a restart, a result for the current
+        month younger than LEADERBOARD_CACHE_TTL is reused from the Leaderboard_Cache
+        collection; otherwise it is recomputed and the stored copy is replaced.
+        """
+        month_key = _month_key()
+        try:
+            cached = await self.leaderboard_cache_collection.find_one({"_id": month_key})
+            if cached:
+                age = (datetime.now(timezone.utc) - cached["computed_at"].replace(tzinfo=timezone.utc)).total_seconds()
+                if age < LEADERBOARD_CACHE_TTL:
+                    return [LeaderboardEntry(**row) for row in cached["rows"]]
+        except Exception as e:
+            logger.error("Error reading cached leaderboard: %s", e)
 
         try:
-            db = self.bot.mongo_db if hasattr(self.bot, 'mongo_db') else AsyncIOMotorClient(mongo_uri)['GPTHellbot']
-            stats_collection = db['User_Stats']
-            alliance_collection = db['Alliance']
-
-            servers = await alliance_collection.find({}, {"discord_server_id": 1, "server_name": 1}).to_list(None)
-            server_map = {str(s['discord_server_id']): s['server_name'] for s in servers if 'discord_server_id' in s and 'server_name' in s}
-
-            players = defaultdict(lambda: {
-                "melee_kills": 0, "kills": 0, "deaths": 0, "shots_fired": 0, "shots_hit": 0,
-                "games_played": 0, "Clan": "Unknown Clan"
-            })
-            all_stats = await stats_collection.find({}).to_list(None)
-            for doc in all_stats:
-                name = doc.get('player_name')
-                if not name:
-                    continue
-                try:
-                    melee = int(doc.get('Melee Kills', 0) or 0)
-                    kills = int(doc.get('Kills', 0) or 0)
-                    deaths = int(doc.get('Deaths', 0) or 0)
-                    shots_fired = int(doc.get('Shots Fired', 0) or 0)
-                    shots_hit = int(doc.get('Shots Hit', 0) or 0)
-                except Exception:
-                    melee = kills = deaths = shots_fired = shots_hit = 0
-                players[name]["melee_kills"] += melee
-                players[name]["kills"] += kills
-                players[name]["deaths"] += deaths
-                players[name]["shots_fired"] += shots_fired
-                players[name]["shots_hit"] += shots_hit
-                players[name]["games_played"] += 1
-                server_id = str(doc.get('discord_server_id', ''))
-                if server_id in server_map:
-                    players[name]["Clan"] = server_map[server_id]
+            server_map = await self.get_server_map()
 
+            # Per-player totals are reduced inside MongoDB, so only one document
+            # per qualifying player crosses the network instead of every game.
             leaderboard = []
-            for name, d in players.items():
-                if d["games_played"] >= MIN_GAMES_PLAYED:
-                    accuracy = (d["shots_hit"] / d["shots_fired"] * 100) if d["shots_fired"] > 0 else 0.0
-                    leaderboard.append({
-                        "player_name": name,
-                        "melee_kills": d["melee_kills"],
-                        "kills": d["kills"],
-                        "deaths": d["deaths"],
-                        "shots_fired": d["shots_fired"],
-                        "shots_hit": d["shots_hit"],
-                        "games_played": d["games_played"],
-                        "Clan": d["Clan"],
-                        "accuracy": accuracy,
-                    })
-
-            # Sort by best average accuracy (descending)
-            leaderboard.sort(key=lambda x: -x["accuracy"])
-            return leaderboard
+            append, clan_for = leaderboard.append, server_map.get
+            async for player in self.stats_collection.aggregate(
+                _leaderboard_pipeline(), allowDiskUse=True, batchSize=LEADERBOARD_BATCH_SIZE
+            ):
+                # The player's clan comes from their latest game on an Alliance member server
+                clan = "Unknown Clan"
+                for sid in reversed(player.pop('server_ids', ())):
+                    if found := clan_for(sid):
+                        clan = found
+                        break
+                append(LeaderboardEntry(**player, clan=clan))
 
         except Exception as e:
-            logger.error(f"Error fetching leaderboard: {e}")
+            logger.error("Error fetching leaderboard: %s", e)
             return []
 
+        try:
+            await self.leaderboard_cache_collection.replace_one(
+                {"_id": month_key},
+                {"computed_at": datetime.now(timezone.utc), "rows": [asdict(entry) for entry in leaderboard]},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error("Error storing cached leaderboard: %s", e)
+        return leaderboard
+
     async def build_leaderboard_embeds(self, leaderboard_data):
         embeds = []
         batch_size = 10
         image_path = LEADERBOARD_IMAGE_PATH if os.path.exists(LEADERBOARD_IMAGE_PATH) else None
+        image_url = f"attachment://{os.path.basename(image_path)}" if image_path else None
 
         if not leaderboard_data:
-            return [], image_path
+            embed = discord.Embed(
+                title=_leaderboard_title(),
+                description=f"No leaderboard data available.\nPlayers must submit at least ({MIN_GAMES_PLAYED}) games to appear!",
+                color=discord.Color.blue()
+            )
+            if image_path:
+                embed.set_image(url=image_url)
+            return [embed], image_path
 
         num_pages = (len(leaderboard_data) + batch_size - 1) // batch_size
+        base_title = f"{_leaderboard_title()}\n*(Best Accuracy!)*"
+        # Field names show at most 25 characters of a player name
+        display_names = [
+            p.player_name if len(p.player_name) <= 25 else f"{p.player_name[:22]}..."
+            for p in leaderboard_data
+        ]
         for i in range(num_pages):
             batch = leaderboard_data[i*batch_size:(i+1)*batch_size]
-            embed = discord.Embed(
-                title=f"**GPT JULY 2025 LEADERBOARD**\n*(Best Accuracy!)*",
-                color=discord.Color.blurple()
-            )
-            if num_pages > 1:
-                embed.title += f" (Page {i+1}/{num_pages})"
-            embed.set_footer(text=f"Leaderboard updates every 8 hours. Minimum {MIN_GAMES_PLAYED} games required.")
+            title = f"{base_title} (Page {i+1}/{num_pages})" if num_pages > 1 else base_title
+            embed = discord.Embed(title=title, color=discord.Color.blurple())
+            embed.set_footer(text=LEADERBOARD_FOOTER)
 
             if image_path and i == 0:
-                embed.set_image(url=f"attachment://{os.path.basename(image_path)}")
+                embed.set_image(url=image_url)
 
+            add_field, field_template = embed.add_field, LEADERBOARD_FIELD_TEMPLATE.format
+            # Ranks continue across pages, so only the first page can hold medals
+            medals = RANK_EMOJIS if i == 0 else ()
             for idx, player in enumerate(batch, start=i*batch_size + 1):
-                rank_emoji = ""
-                if idx == 1: rank_emoji = "🥇 "
-                elif idx == 2: rank_emoji = "🥈 "
-                elif idx == 3: rank_emoji = "🥉 "
-                name = (player['player_name'][:22] + "...") if len(player['player_name']) > 25 else player['player_name']
-                embed.add_field(
+                rank_emoji = medals[idx] if idx < len(medals) else ""
+                name = display_names[idx - 1]
+                add_field(
                     name=f"{rank_emoji}#{idx}. {name}",
-                    value=(
-                        f"**Clan:** {player['Clan']}\n"
-                        f"**Melee Kills:** {player['melee_kills']}\n"
-                        f"**Kills:** {player['kills']}\n"
-                        f"**Deaths:** {player['deaths']}\n"
-                        f"**Accuracy:** {player['accuracy']:.1f}%\n"
-                        f"**Shots Hit:** {player['shots_hit']}\n"
-                        f"**Shots Fired:** {player['shots_fired']}\n"
-                        f"*Games: {player['games_played']}*"
-                    ),
+                    value=field_template(p=player),
                     inline=True
                 )
             embeds.append(embed)
@@ -7,6 +7,11 @@ import logging
 # from database import get_mongo_client
 # from utils import log_to_monitor_channel
 import os # Import os for path joining
+import hashlib
+import json
+import time
+from cogs.server_listing_cache import get_server_data, update_cached_server_data
+from cogs.message_utils import MENU_TITLE
 
 # Map each clan name to the ID of the guild where we store the invite link
 CLAN_SERVER_IDS = {
@@ -18,6 +23,22 @@ CLAN_SERVER_IDS = {
 # Define the path to the image file relative to where the bot is run (e.g., main.py location)
 IMAGE_PATH = "gpt_network.png"
 
+# Static part of the SOS menu description, below the clan links
+_INSTRUCTIONS_MD = (
+    "**Instructions:**\n"
+    "- **LAUNCH SOS**: Quickly send an SOS for any mission (touchscreens).\n\n"
+    "- **CREATE MISSION**: Customize your SOS mission by selecting various options "
+    "(Enemy Type, Difficulty, Play Style, Voice Comms, and Notes).\n\n"
+    "- **REGISTRATION**: Register your Helldivers 2 player name in your allied server to claim your clan.\n\n"
+    "**Notes:** Created voice channels/SOS embeds will expire after **60 seconds** of inactivity.\n\n"
+    "Click the invite link to join the SOS voice channel!\n\n"
+    "*Please choose an option below:*"
+)
+MENU_EMBED_COLOR = discord.Color.blue()
+
+# Seconds the clan invite-links Markdown is reused before re-reading MongoDB
+ALLIANCE_LINKS_TTL = 600
+
 
 class SOSMenuView(discord.ui.View):
     """
@@ -94,6 +115,20 @@ class SOSMenuView(discord.ui.View):
             )
 
 
+def get_sos_menu_view(bot: commands.Bot) -> SOSMenuView:
+    """
+    Returns the bot's single persistent SOSMenuView, creating and registering it
+    on first use. discord.py can't unregister views, so reusing one instance
+    keeps cog reloads from piling up duplicate persistent views.
+    """
+    view = getattr(bot, 'sos_menu_view', None)
+    if view is None:
+        view = bot.sos_menu_view = SOSMenuView(bot)
+        bot.add_view(view)
+        logging.info("SOSMenuView registered globally as a persistent view.")
+    return view
+
+
 class MenuViewCog(commands.Cog):
     """
     A cog to manage and provide the SOSMenuView. It builds a single Markdown
@@ -102,9 +137,10 @@ class MenuViewCog(commands.Cog):
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.sos_menu_view = SOSMenuView(bot)
-        self.bot.add_view(self.sos_menu_view)
-        logging.info("SOSMenuView registered globally as a persistent view.")
+        self.sos_menu_view = get_sos_menu_view(bot)
+        # Cached clan invite-links Markdown and when it was built (monotonic)
+        self._alliance_md_cache = None
+        self._alliance_md_ts = 0.0
 
     # Keeping on_ready listener as you had it
     @commands.Cog.listener()
@@ -116,6 +152,74 @@ class MenuViewCog(commands.Cog):
         #     await self.send_sos_menu_to_guild(guild) # Caution: sends every startup
 
 
+    async def _get_alliance_links_md(self) -> str:
+        """
+        Returns the clan invite links as one Markdown string. It's the same for
+        every guild, so it is cached for ALLIANCE_LINKS_TTL seconds.
+        """
+        now = time.monotonic()
+        if self._alliance_md_cache is not None and now - self._alliance_md_ts < ALLIANCE_LINKS_TTL:
+            return self._alliance_md_cache
+
+        server_listing = self.bot.mongo_db["Server_Listing"]
+
+        # Retrieve every clan server's invite link from MongoDB in a single query
+        cursor = server_listing.find(
+            {"discord_server_id": {"$in": list(CLAN_SERVER_IDS.values())}},
+            {"discord_server_id": 1, "discord_invite_link": 1, "_id": 0}
+        )
+        invite_links = {
+            doc["discord_server_id"]: doc["discord_invite_link"]
+            async for doc in cursor if doc.get("discord_invite_link")
+        }
+
+        alliance_link_chunks = []
+        for clan_name, clan_server_id in CLAN_SERVER_IDS.items():
+            invite_link = invite_links.get(clan_server_id)
+            if not invite_link:
+                invite_link = "https://discord.gg/unknown" # Default placeholder
+                logging.warning(f"No server data or invite link found in DB for clan '{clan_name}' (Server ID: {clan_server_id}). Using placeholder link.")
+
+            # Build a clickable link for this clan
+            alliance_link_chunks.append(f"[{clan_name}]({invite_link})")
+
+        # Combine them into one Markdown string, e.g.:  [Kai's](...) | [Guardians](...) | ...
+        alliance_links_md = " | ".join(alliance_link_chunks)
+        self._alliance_md_cache = alliance_links_md
+        self._alliance_md_ts = now
+        return alliance_links_md
+
+    async def build_sos_menu_embed(self) -> discord.Embed:
+        """
+        Builds the SOS menu embed. Each clan name links to that clan's server
+        invite link (retrieved from MongoDB). If the menu image exists, the embed
+        image points at it as an attachment named gpt_network.png.
+        """
+        alliance_links_md = await self._get_alliance_links_md()
+
+        # Build the embed description
+        embed_description = f"**{alliance_links_md}**\n\n{_INSTRUCTIONS_MD}"
+
+        embed = discord.Embed(
+            title=MENU_TITLE,
+            description=embed_description,
+            color=MENU_EMBED_COLOR
+        )
+
+        if os.path.exists(IMAGE_PATH):
+            # Set the image of the embed to the attached file
+            # The URL format is "attachment://filename.ext"
+            embed.set_image(url=f"attachment://gpt_network.png")
+        return embed
+
+    def sos_menu_hash(self, embed: discord.Embed) -> str:
+        """Hash of the menu's embed and button layout, to tell whether a posted menu is stale."""
+        payload = {
+            "embed": embed.to_dict(),
+            "buttons": [getattr(item, "custom_id", None) for item in self.sos_menu_view.children],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
     async def send_sos_menu_to_guild(self, guild: discord.Guild):
         """
         Sends the SOS menu with instructions to a specific guild's designated GPT channel.
@@ -128,7 +232,8 @@ class MenuViewCog(commands.Cog):
         try:
             # Access the Server_Listing collection from the bot's mongo_db attribute
             server_listing = self.bot.mongo_db["Server_Listing"]
-            server_data = await server_listing.find_one({"discord_server_id": guild.id})
+            # Served from the shared Server_Listing TTL cache when fresh
+            server_data = await get_server_data(self.bot, guild.id)
 
             if not server_data:
                 logging.warning(f"No server data found for guild '{guild.name}'. Skipping sending SOS menu.")
@@ -145,43 +250,8 @@ class MenuViewCog(commands.Cog):
                 logging.warning(f"GPT channel (ID: {gpt_channel_id}) not found in guild '{guild.name}'. Cannot send SOS menu.")
                 return
 
-            # 2) For each clan, retrieve the invite link from the corresponding server in MongoDB
-            alliance_link_chunks = []
-            for clan_name, clan_server_id in CLAN_SERVER_IDS.items():
-                # Access the Server_Listing collection again for each clan server
-                clan_server_data = await server_listing.find_one({"discord_server_id": clan_server_id})
-                invite_link = "https://discord.gg/unknown" # Default placeholder
-                if clan_server_data and "discord_invite_link" in clan_server_data:
-                    # Use the clan's actual invite link
-                    invite_link = clan_server_data["discord_invite_link"]
-                else:
-                    logging.warning(f"No server data or invite link found in DB for clan '{clan_name}' (Server ID: {clan_server_id}). Using placeholder link.")
-
-
-                # Build a clickable link for this clan
-                alliance_link_chunks.append(f"[{clan_name}]({invite_link})")
-
-            # Combine them into one Markdown string, e.g.:  [Kai's](...) | [Guardians](...) | ...
-            alliance_links_md = " | ".join(alliance_link_chunks)
-
-            # 3) Build the embed description
-            embed_description = (
-                f"**{alliance_links_md}**\n\n"
-                "**Instructions:**\n"
-                "- **LAUNCH SOS**: Quickly send an SOS for any mission (touchscreens).\n\n"
-                "- **CREATE MISSION**: Customize your SOS mission by selecting various options "
-                "(Enemy Type, Difficulty, Play Style, Voice Comms, and Notes).\n\n"
-                "- **REGISTRATION**: Register your Helldivers 2 player name in your allied server to claim your clan.\n\n"
-                "**Notes:** Created voice channels/SOS embeds will expire after **60 seconds** of inactivity.\n\n"
-                "Click the invite link to join the SOS voice channel!\n\n"
-                "*Please choose an option below:*"
-            )
-
-            embed = discord.Embed(
-                title="Welcome to the GPT LFG Network!",
-                description=embed_description,
-                color=discord.Color.blue()
-            )
+            # 2-3) Build the menu embed (clan invite links + instructions)
+            embed = await self.build_sos_menu_embed()
 
             # >>> Start of image embedding logic <<<
             file = None
@@ -189,16 +259,15 @@ class MenuViewCog(commands.Cog):
                  # Check if the image file exists at the defined path
                  if os.path.exists(IMAGE_PATH):
                       # Create a discord.File object from the image file
+                      # (build_sos_menu_embed already points the embed image at it)
                       file = discord.File(IMAGE_PATH, filename="gpt_network.png")
-                      # Set the image of the embed to the attached file
-                      # The URL format is "attachment://filename.ext"
-                      embed.set_image(url=f"attachment://gpt_network.png")
                       logging.debug(f"Image '{IMAGE_PATH}' found and prepared for embed.")
                  else:
                       logging.warning(f"Image file not found at path: {IMAGE_PATH}. Cannot embed image.")
             except Exception as e:
                  logging.error(f"Error preparing image file '{IMAGE_PATH}' for embed: {e}", exc_info=True)
                  file = None # Ensure file is None if an error occurred
+                 embed.set_image(url=None) # Don't reference an attachment that isn't sent
 
             # >>> End of image embedding logic <<<
 
@@ -215,7 +284,17 @@ class MenuViewCog(commands.Cog):
                       sent_message = await gpt_channel.send(embed=embed, view=self.sos_menu_view)
                       logging.info(f"SOS menu sent without image to guild '{guild.name}' in channel '{gpt_channel.name}'.")
 
-                 # You might want to store sent_message.id and sent_message.channel.id here if you plan to edit/delete the message later
+                 # Remember the menu message (and a hash of its content) so later refreshes/
+                 # cleanups can find it by ID and skip resending an unchanged menu
+                 menu_fields = {"menu_message_id": sent_message.id, "menu_hash": self.sos_menu_hash(embed)}
+                 try:
+                      await server_listing.update_one(
+                           {"discord_server_id": guild.id},
+                           {"$set": menu_fields}
+                      )
+                      update_cached_server_data(self.bot, guild.id, menu_fields)
+                 except Exception as e:
+                      logging.error(f"Error storing SOS menu message ID for guild '{guild.name}': {e}")
 
             except discord.Forbidden:
                  logging.error(f"Bot is forbidden from sending messages (or messages with files) to channel '{gpt_channel.name}' ({gpt_channel.id}) in guild '{guild.name}'. Check channel permissions.")
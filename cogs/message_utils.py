@@ -0,0 +1,63 @@
+# message_utils.py
+import discord
+
+# Embed title of the live SOS menu view
+MENU_TITLE = "Welcome to the GPT LFG Network!"
+
+# Embed titles of bot messages that are always stale after a restart: SOS broadcasts
+# and menus from before the rename to "GPT LFG Network".
+STALE_TITLES = frozenset({
+    "SOS ACTIVATED",
+    "Welcome to the SOS Alliance Network!",
+})
+
+# Embed titles of bot messages (SOS broadcasts and menu views) that a menu refresh removes.
+PURGE_TITLES = STALE_TITLES | {MENU_TITLE}
+
+
+def is_sos_or_menu_message(message: discord.Message) -> bool:
+    """True if the message's first embed is an SOS broadcast or a menu view."""
+    return bool(message.embeds) and message.embeds[0].title in PURGE_TITLES
+
+
+def is_stale_bot_message(message: discord.Message) -> bool:
+    """True if the message's first embed is an SOS broadcast or a pre-rename menu view."""
+    return bool(message.embeds) and message.embeds[0].title in STALE_TITLES
+
+
+async def purge_bot_messages(channel: discord.TextChannel, check, *, limit=100, max_count=None, reason=None):
+    """
+    Deletes the bot's own messages among the last `limit` messages in the channel
+    that also satisfy `check`. TextChannel.purge bulk-deletes them in batches of
+    up to 100, only falling back to single deletes for messages older than 14 days.
+    If `max_count` is given, the history scan stops as soon as that many matches
+    are found instead of walking all `limit` messages.
+    Returns the list of deleted messages.
+    """
+    bot_id = channel.guild.me.id
+    if max_count is None:
+        return await channel.purge(
+            limit=limit,
+            check=lambda message: message.author.id == bot_id and check(message),
+            bulk=True,
+            reason=reason
+        )
+
+    matches = []
+    async for message in channel.history(limit=limit):
+        if message.author.id == bot_id and check(message):
+            matches.append(message)
+            if len(matches) >= max_count:
+                break
+    if not matches:
+        return matches
+    try:
+        await channel.delete_messages(matches, reason=reason)
+    except discord.HTTPException:
+        # Bulk delete rejects messages older than 14 days; delete those one by one
+        for message in matches:
+            try:
+                await message.delete()
+            except discord.NotFound:
+                pass
+    return matches
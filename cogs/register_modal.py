@@ -1,8 +1,8 @@
 import discord
 from discord.ext import commands
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
-import asyncio
+from cogs.server_listing_cache import get_server_data
 
 class RegisterModal(discord.ui.Modal, title="Register as a Helldiver"):
     """
@@ -19,33 +19,6 @@ class RegisterModal(discord.ui.Modal, title="Register as a Helldiver"):
         super().__init__()
         self.bot = bot
         self.interaction = interaction
-        self.sos_lfg_role_select = None  # Initialize to None
-        # Add the SOS LFG role select menu dynamically
-        asyncio.create_task(self._add_role_select())
-
-    async def _add_role_select(self):
-        """
-        This method adds the SOS LFG role select menu dynamically,
-        using the guild context from the interaction.
-        """
-        try:
-            if hasattr(self.bot, 'mongo_db') and self.bot.mongo_db is not None:
-                server_listing = self.bot.mongo_db['Server_Listing']
-                server_data = await server_listing.find_one({"discord_server_id": self.interaction.guild_id})
-                if server_data and 'sos_lfg_role_id' in server_data:
-                    role_id = server_data['sos_lfg_role_id']
-                    guild = self.bot.get_guild(self.interaction.guild_id)
-                    if guild:
-                        role = guild.get_role(role_id)
-                        if role:
-                            options = [discord.SelectOption(label=role.name, value=str(role.id))]
-                            self.sos_lfg_role_select = discord.ui.Select(
-                                placeholder="Select SOS LFG Role (Optional)",
-                                options=options,
-                            )
-                            self.add_item(self.sos_lfg_role_select)
-        except Exception as e:
-            logging.error(f"Error adding SOS LFG role select: {e}")
 
     async def on_submit(self, interaction: discord.Interaction):
         """
@@ -59,28 +32,26 @@ class RegisterModal(discord.ui.Modal, title="Register as a Helldiver"):
             server_nickname = interaction.user.display_name
             player_name = self.helldiver_name.value
 
-            # Prepare the document
+            # Fields that follow the user's latest registration
             player_data = {
-                "discord_id": discord_id,
                 "discord_server_id": discord_server_id,
                 "server_name": server_name,
                 "server_nickname": server_nickname,
                 "player_name": player_name,
-                "registered_at": datetime.utcnow()
             }
 
-            # Insert into the Alliance collection
+            # Upsert into the Alliance collection; discord_id comes from the filter
+            # on insert, and registered_at keeps the first registration time
             alliance_collection = self.bot.mongo_db['Alliance']
             await alliance_collection.update_one(
                 {"discord_id": discord_id},
-                {"$set": player_data},
+                {"$set": player_data, "$setOnInsert": {"registered_at": datetime.now(timezone.utc)}},
                 upsert=True
             )
 
-            # Handle role assignment if a role was selected
-            selected_role_id = None
-            if self.sos_lfg_role_select and self.sos_lfg_role_select.values:
-                selected_role_id = int(self.sos_lfg_role_select.values[0])
+            # Assign the server's SOS LFG role, if one is configured
+            server_data = await get_server_data(self.bot, discord_server_id)
+            selected_role_id = server_data.get("sos_lfg_role_id") if server_data else None
 
             if selected_role_id:
                 guild = interaction.guild
@@ -88,12 +59,12 @@ class RegisterModal(discord.ui.Modal, title="Register as a Helldiver"):
                 if role:
                     try:
                         await interaction.user.add_roles(role)
-                        await interaction.followup.send(
+                        await interaction.response.send_message(
                             f"Registration successful! Welcome, **{player_name}**! You have been assigned the **{role.name}** role.",
                             ephemeral=True
                         )
                         logging.info(f"Assigned role {role.name} to user {player_name} ({discord_id}).")
-                        return  # Exit after sending followup
+                        return  # Exit after responding
                     except discord.Forbidden:
                         logging.warning(f"Bot lacks permissions to assign role {role.name} to user {player_name} ({discord_id}).")
                     except Exception as role_e:
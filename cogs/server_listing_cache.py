@@ -0,0 +1,80 @@
+# server_listing_cache.py
+import asyncio
+import time
+
+# Seconds a cached Server_Listing document is considered fresh
+SERVER_LISTING_CACHE_TTL = 300
+
+
+def _get_cache(bot) -> dict:
+    """Returns the bot-wide cache, mapping guild ID -> (cached_at, server_data)."""
+    cache = getattr(bot, '_server_listing_cache', None)
+    if cache is None:
+        cache = bot._server_listing_cache = {}
+    return cache
+
+
+async def get_server_data(bot, guild_id: int):
+    """
+    Returns the Server_Listing document for a guild, served from an in-process
+    TTL cache when fresh. Falls back to MongoDB on a miss or expired entry.
+    Returns None if the guild has no document.
+    """
+    cache = _get_cache(bot)
+    now = time.monotonic()
+    entry = cache.get(guild_id)
+    if entry and now - entry[0] < SERVER_LISTING_CACHE_TTL:
+        return entry[1]
+
+    server_data = await bot.mongo_db['Server_Listing'].find_one({"discord_server_id": guild_id})
+    cache[guild_id] = (now, server_data)
+    return server_data
+
+
+def update_cached_server_data(bot, guild_id: int, fields: dict):
+    """
+    Write-through for a $set on a guild's Server_Listing document. Merges the
+    fields into the cached document, or drops the entry if there isn't a full
+    document cached to merge into.
+    """
+    cache = _get_cache(bot)
+    entry = cache.get(guild_id)
+    if entry and entry[1] is not None:
+        cache[guild_id] = (time.monotonic(), {**entry[1], **fields})
+    else:
+        cache.pop(guild_id, None)
+    # The write may have added a guild or changed its broadcast fields
+    invalidate_server_roster(bot)
+
+
+# Only the Server_Listing fields the network-wide SOS broadcast reads
+ROSTER_PROJECTION = {"_id": 0, "discord_server_id": 1, "gpt_channel_id": 1, "sos_lfg_role_id": 1}
+
+
+async def get_server_roster(bot) -> list:
+    """
+    Returns every guild's broadcast fields (ROSTER_PROJECTION), served from an
+    in-process cache that is dropped whenever the roster may have changed and
+    otherwise refreshed after SERVER_LISTING_CACHE_TTL as a safety net.
+    """
+    lock = getattr(bot, '_server_roster_lock', None)
+    if lock is None:
+        lock = bot._server_roster_lock = asyncio.Lock()
+
+    entry = getattr(bot, '_server_roster_cache', None)
+    if entry and time.monotonic() - entry[0] < SERVER_LISTING_CACHE_TTL:
+        return entry[1]
+
+    async with lock:
+        # Another caller may have refreshed the roster while this one waited
+        entry = getattr(bot, '_server_roster_cache', None)
+        if entry and time.monotonic() - entry[0] < SERVER_LISTING_CACHE_TTL:
+            return entry[1]
+        roster = await bot.mongo_db['Server_Listing'].find({}, ROSTER_PROJECTION).to_list(None)
+        bot._server_roster_cache = (time.monotonic(), roster)
+        return roster
+
+
+def invalidate_server_roster(bot):
+    """Drops the cached roster so the next get_server_roster call re-reads MongoDB."""
+    bot._server_roster_cache = None
@@ -2,10 +2,50 @@
 import discord
 from discord.ext import commands
 import asyncio
+import itertools
 import logging
-from datetime import datetime
 from cogs.sos_view import SOSView # Ensure this import path is correct
+from cogs.server_listing_cache import get_server_data, get_server_roster, invalidate_server_roster, update_cached_server_data
+from cogs.constants import CATEGORY_NAME, SOS_VOICE_CHANNEL_PREFIX
 import time
+from dataclasses import dataclass, field
+from pymongo import InsertOne
+
+# Seconds after launch that an SOS expires if its voice channel is empty.
+# Matches the 1-hour lifetime of the voice channel invite in the SOS embed.
+SOS_TTL_SECONDS = 3600
+
+# Seconds the SOS embed edit waits so a burst of joiners costs one edit per guild
+SOS_EDIT_DEBOUNCE_SECONDS = 0.75
+
+# Maximum number of broadcast message sends/edits/deletes in flight at once, kept
+# below Discord's global rate limit so the fan-outs don't trigger 429 backoff
+SOS_BROADCAST_CONCURRENCY = 25
+
+# Seconds queued SOS documents wait for more launches before being written together
+SOS_INSERT_FLUSH_INTERVAL = 0.2
+# Most SOS documents written in one bulk_write
+SOS_INSERT_BATCH_SIZE = 100
+
+
+@dataclass(slots=True)
+class SOSSession:
+    """The state of one live SOS, tracked per voice channel until the SOS is deleted."""
+    user_ids: set  # Members in the fleet; their names are in fleet_response
+    fleet_response: str  # Fleet Response field value, appended to per joiner
+    voice_channel: discord.VoiceChannel
+    initiator_id: int
+    embed: discord.Embed | None = None  # Built after the voice channel is created
+    status_index: int | None = None
+    fleet_response_index: int | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)  # Guards changes to the session
+    sos_messages: dict = field(default_factory=dict)  # Guild ID -> broadcast message
+    last_activity: float = field(default_factory=time.time)
+    prompted_users: set = field(default_factory=set)  # Users who have been prompted to join
+    dm_messages: dict = field(default_factory=dict)  # Optional: DM messages sent
+    expiry_handle: asyncio.TimerHandle | None = None  # Expires the SOS after SOS_TTL_SECONDS
+    edit_task: asyncio.Task | None = None  # Pending debounced embed edit, see _coalesce_sos_edits
+
 
 class SOSCog(commands.Cog):
     """
@@ -16,7 +56,67 @@ class SOSCog(commands.Cog):
         self.bot = bot
         self.voice_channels = {}  # Track created voice channels
         self.sos_data_by_channel = {}  # Map voice channel IDs to SOS data
-        self.cleanup_tasks = {}  # Map voice channel IDs to their cleanup tasks
+        self.cleanup_handles = {}  # Map voice channel IDs to their pending cleanup timers
+        self.voice_member_counts = {}  # Map voice channel IDs to how many members are connected
+        self._background_tasks = set()  # Strong references to tasks started from timers
+        self._broadcast_semaphore = asyncio.Semaphore(SOS_BROADCAST_CONCURRENCY)
+        self._qrf_reservations = {}  # Map guild IDs to 'SOS QRF#' numbers whose channels are being created
+        self._sos_insert_queue = asyncio.Queue()  # User_SOS documents awaiting the batched insert
+        self._sos_insert_task = None
+
+    async def cog_load(self):
+        self._sos_insert_task = asyncio.create_task(self._sos_insert_writer())
+
+    async def cog_unload(self):
+        # The writer flushes whatever is still queued before it exits
+        if self._sos_insert_task:
+            self._sos_insert_task.cancel()
+            try:
+                await self._sos_insert_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sos_insert_writer(self):
+        """
+        Inserts queued User_SOS documents with one bulk_write per flush window, so a
+        burst of launches costs a single round trip.
+        """
+        batch = []
+        try:
+            while True:
+                batch.append(await self._sos_insert_queue.get())
+                # Let the rest of a burst arrive before writing
+                await asyncio.sleep(SOS_INSERT_FLUSH_INTERVAL)
+                while len(batch) < SOS_INSERT_BATCH_SIZE and not self._sos_insert_queue.empty():
+                    batch.append(self._sos_insert_queue.get_nowait())
+                # Hand the batch off before awaiting, so a cancel mid-write doesn't flush it again
+                to_write, batch = batch, []
+                await self._insert_sos_documents(to_write)
+        except asyncio.CancelledError:
+            while not self._sos_insert_queue.empty():
+                batch.append(self._sos_insert_queue.get_nowait())
+            if batch:
+                await self._insert_sos_documents(batch)
+            raise
+
+    async def _insert_sos_documents(self, documents):
+        try:
+            await self.bot.mongo_db['User_SOS'].bulk_write([InsertOne(d) for d in documents], ordered=False)
+            logging.info(f"Inserted {len(documents)} SOS document(s).")
+        except Exception as e:
+            logging.error(f"Failed to insert {len(documents)} SOS document(s): {e}")
+
+    def _run_in_background(self, coro):
+        """Starts a task from a timer callback, holding a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _broadcast_call(self, coro):
+        """Awaits one request of a network-wide send/edit/delete fan-out, within SOS_BROADCAST_CONCURRENCY."""
+        async with self._broadcast_semaphore:
+            return await coro
 
     def get_sos_view(self):
         """Returns an instance of the SOSView."""
@@ -34,6 +134,52 @@ class SOSCog(commands.Cog):
         # You might see warnings if cleanup_cog attempts similar actions.
 
 
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        # A new guild joins the broadcast network
+        invalidate_server_roster(self.bot)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        # Stop broadcasting to a guild the bot has left
+        invalidate_server_roster(self.bot)
+        # SOS sessions hosted there can't be cleaned up through their voice channels any more
+        for channel_id in [cid for cid, c in self.voice_channels.items() if c.guild.id == guild.id]:
+            await self._end_sos_for_deleted_channel(channel_id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if channel.id in self.voice_channels:
+            logging.info(f"SOS voice channel {channel.id} was deleted outside the bot. Ending its SOS.")
+            await self._end_sos_for_deleted_channel(channel.id)
+
+    async def _end_sos_for_deleted_channel(self, channel_id):
+        """
+        Drops a voice channel that no longer exists from tracking, so the channel object
+        isn't kept alive here, and deletes its SOS embeds across the network.
+        """
+        self.voice_channels.pop(channel_id, None)
+        await self.delete_voice_channel_and_message(channel_id)
+
+
+    def _reserve_qrf_number(self, guild: discord.Guild) -> int:
+        """
+        Returns the next 'SOS QRF#' number for a guild and reserves it until its voice
+        channel is created. Runs without awaiting, so the scan and the reservation are atomic.
+        """
+        taken = set(self._qrf_reservations.setdefault(guild.id, set()))
+        # Tracked channels are included since the guild cache may lag behind a fresh create
+        tracked = (c for c in self.voice_channels.values() if c.guild.id == guild.id)
+        for channel in itertools.chain(guild.voice_channels, tracked):
+            if channel.name.startswith(SOS_VOICE_CHANNEL_PREFIX):
+                suffix = channel.name[len(SOS_VOICE_CHANNEL_PREFIX):]
+                if suffix.isdigit():
+                    taken.add(int(suffix))
+        next_number = max(taken, default=0) + 1
+        self._qrf_reservations[guild.id].add(next_number)
+        return next_number
+
+
     async def check_bot_permissions(self, guild: discord.Guild):
         """Verify the bot has the required permissions in a guild for basic SOS ops."""
         # This check might be redundant if GuildManagementCog already did a strict check
@@ -50,6 +196,31 @@ class SOSCog(commands.Cog):
             # during broadcast where specific channel perms matter.
             pass # Just log, don't block the whole process_sos attempt
 
+    async def get_gpt_category(self, guild: discord.Guild):
+        """
+        Returns the guild's GPT NETWORK category by the category_id GuildManagementCog stores
+        in Server_Listing. Falls back to a scan by name, recording the ID it finds, when the
+        stored ID is missing or stale. Returns None if the guild has no such category.
+        """
+        server_data = await get_server_data(self.bot, guild.id)
+        category_id = server_data.get("category_id") if server_data else None
+        category = guild.get_channel(category_id) if category_id else None
+        if isinstance(category, discord.CategoryChannel) and category.name == CATEGORY_NAME:
+            return category
+
+        category = discord.utils.get(guild.categories, name=CATEGORY_NAME)
+        # Only guilds that went through setup have a document to record the ID in
+        if category and server_data:
+            try:
+                await self.bot.mongo_db['Server_Listing'].update_one(
+                    {"discord_server_id": guild.id},
+                    {"$set": {"category_id": category.id}}
+                )
+                update_cached_server_data(self.bot, guild.id, {"category_id": category.id})
+            except Exception as e:
+                logging.error(f"Failed to store category ID for guild '{guild.name}': {e}")
+        return category
+
     async def get_or_create_category(self, guild: discord.Guild, category_name: str = "GPT NETWORK"):
         """Retrieves or creates a dedicated category for GPT voice channels."""
         # This logic should ideally be handled by GuildManagementCog during setup
@@ -150,13 +321,11 @@ class SOSCog(commands.Cog):
                  return
 
 
-            sos_collection = self.bot.mongo_db['User_SOS']
-
-            # Insert the new SOS into the database
+            # Queue the new SOS for the batched User_SOS insert, off the launch's critical path
             sos_document = {
                 "discord_id": interaction.user.id,
                 "user_nickname": interaction.user.display_name,
-                "created_at": datetime.utcnow(),
+                "created_at": discord.utils.utcnow(),
                 "enemy": view.enemy_type,
                 "difficulty": view.difficulty,
                 "mission": view.mission,
@@ -164,8 +333,8 @@ class SOSCog(commands.Cog):
                 "notes": view.notes or ""
             }
 
-            await sos_collection.insert_one(sos_document)
-            logging.info(f"SOS document inserted for user {interaction.user.id} in guild {interaction.guild.id}")
+            self._sos_insert_queue.put_nowait(sos_document)
+            logging.info(f"SOS document queued for user {interaction.user.id} in guild {interaction.guild.id}")
 
 
             host_guild = interaction.guild
@@ -190,24 +359,13 @@ class SOSCog(commands.Cog):
 
             # Generate unique name for the voice channel in the host guild
             # This logic is specific to the host guild where the SOS is initiated
-            category = discord.utils.get(host_guild.categories, name="GPT NETWORK") # Try to get category
+            category = await self.get_gpt_category(host_guild) # Try to get category
             # If category doesn't exist or bot can't manage channels, voice channel creation might fail below.
             # The error handling around voice channel creation will catch this.
 
-            existing_channels = [
-                c.name for c in host_guild.voice_channels if c.name.startswith("SOS QRF#")
-            ]
-            next_number = (
-                max(
-                    [
-                        int(c.split("#")[-1])
-                        for c in existing_channels
-                        if c.split("#")[-1].isdigit()
-                    ],
-                    default=0
-                ) + 1
-            )
-            voice_channel_name = f"SOS QRF#{next_number}"
+            # Reserved synchronously, so concurrent SOS launches in this guild can't pick the same number
+            next_number = self._reserve_qrf_number(host_guild)
+            voice_channel_name = f"{SOS_VOICE_CHANNEL_PREFIX}{next_number}"
 
             # Permissions for the voice channel
             overwrites = {
@@ -219,95 +377,99 @@ class SOSCog(commands.Cog):
                  )
             }
 
-            voice_channel = None # Initialize voice_channel
+            # Fetch the network roster (served from the shared roster cache, which only holds
+            # the fields the broadcast needs) while the voice channel and invite are created
+            roster_task = asyncio.create_task(get_server_roster(self.bot))
             try:
-                 # Create the voice channel, attempting to place it under the category
-                 # If category is None or bot lacks permissions, it might create it globally.
-                 voice_channel = await host_guild.create_voice_channel(
-                     name=voice_channel_name,
-                     overwrites=overwrites,
-                     user_limit=99,
-                     category=category # category can be None
-                 )
-                 logging.info(f"Created voice channel '{voice_channel.name}' (ID: {voice_channel.id}) in guild '{host_guild.name}'.")
-                 # Track the voice channel globally across all SOS
-                 self.voice_channels[voice_channel.id] = voice_channel
-                 logging.debug(f"Added voice channel {voice_channel.id} to tracking.")
-
-                 # Create an invite link (1-hour expiry)
-                 invite = await voice_channel.create_invite(max_age=3600, max_uses=0)
-                 invite_url = invite.url
-                 logging.info(f"Created invite link for voice channel {voice_channel.id}: {invite_url}")
-
-            except discord.Forbidden:
-                 logging.error(f"Bot lacks 'Manage Channels' permission to create voice channel in guild '{host_guild.name}'.")
-                 # Use followup.send after deferring
-                 await interaction.followup.send(
-                      "Bot is missing necessary permissions to create the voice channel.",
-                      ephemeral=True
-                  )
-                 return # Cannot proceed without a voice channel
-            except Exception as e:
-                 logging.error(f"Failed to create voice channel in guild '{host_guild.name}': {e}")
-                 # Use followup.send after deferring
-                 await interaction.followup.send(
-                      "An error occurred while creating the voice channel. Please try again later.",
-                      ephemeral=True
-                  )
-                 return # Cannot proceed without a voice channel
-
-
-            # Initialize sos_data after successful voice channel creation
-            sos_data = {
-                "users": {interaction.user.id: interaction.user.display_name},
-                "embed": None, # Embed will be created below
-                "status_index": None,
-                "fleet_response_index": None,
-                "voice_channel": voice_channel,
-                "lock": asyncio.Lock(), # Use a lock for modifying sos_data
-                "sos_messages": {}, # Map guild_id to the broadcast message object
-                "initiator_id": interaction.user.id,
-                "last_activity": time.time(),
-                "prompted_users": set(), # Track users who have been prompted to join
-                "dm_messages": {} # Optional: track DM messages sent
-            }
-
-
-            fleet_response = '\n'.join(sos_data['users'].values())
-
-            # Build the embed
-            embed = discord.Embed(
-                title="SOS ACTIVATED",
-                description=(
-                    # Use the invite_url variable here
-                    f"**Comms:** {invite_url}\n\n" # Plain text URL
-                    f"**Enemy:** {view.enemy_type or 'Open'}\n"
-                    f"**Difficulty:** {view.difficulty or 'Open'}\n"
-                    f"**Mission Focus:** {view.mission or 'Open'}\n"
-                    f"**Voice:** {view.voice or 'Open'}\n"
-                    f"**Notes:** {view.notes or 'None'}\n\n"
-                ),
-                color=discord.Color.red()
-            )
-            embed.add_field(name="HOST CLAN", value=host_guild.name, inline=False)
-            embed.add_field(name="Status", value="**Open**", inline=False)
-            status_index = len(embed.fields) - 1
-            embed.add_field(name="Fleet Response", value=fleet_response, inline=False)
-            fleet_response_index = len(embed.fields) - 1
-
-            sos_data['embed'] = embed
-            sos_data['status_index'] = status_index
-            sos_data['fleet_response_index'] = fleet_response_index
+                voice_channel = None # Initialize voice_channel
+                try:
+                     # Create the voice channel, attempting to place it under the category
+                     # If category is None or bot lacks permissions, it might create it globally.
+                     voice_channel = await host_guild.create_voice_channel(
+                         name=voice_channel_name,
+                         overwrites=overwrites,
+                         user_limit=99,
+                         category=category # category can be None
+                     )
+                     logging.info(f"Created voice channel '{voice_channel.name}' (ID: {voice_channel.id}) in guild '{host_guild.name}'.")
+                     # Track the voice channel globally across all SOS
+                     self.voice_channels[voice_channel.id] = voice_channel
+                     self.voice_member_counts[voice_channel.id] = 0
+                     logging.debug(f"Added voice channel {voice_channel.id} to tracking.")
 
+                     # Create an invite link (1-hour expiry)
+                     invite = await voice_channel.create_invite(max_age=3600, max_uses=0)
+                     invite_url = invite.url
+                     logging.info(f"Created invite link for voice channel {voice_channel.id}: {invite_url}")
 
-            # Broadcast to all known GPT channels in the network
-            server_listing = self.bot.mongo_db['Server_Listing']
-            # Fetch only necessary fields to minimize data transfer, including the role ID
-            all_servers_cursor = server_listing.find({}, {"discord_server_id": 1, "gpt_channel_id": 1, "sos_lfg_role_id": 1})
-            all_servers_data = await all_servers_cursor.to_list(None)
+                except discord.Forbidden:
+                     logging.error(f"Bot lacks 'Manage Channels' permission to create voice channel in guild '{host_guild.name}'.")
+                     # Use followup.send after deferring
+                     await interaction.followup.send(
+                          "Bot is missing necessary permissions to create the voice channel.",
+                          ephemeral=True
+                      )
+                     return # Cannot proceed without a voice channel
+                except Exception as e:
+                     logging.error(f"Failed to create voice channel in guild '{host_guild.name}': {e}")
+                     # Use followup.send after deferring
+                     await interaction.followup.send(
+                          "An error occurred while creating the voice channel. Please try again later.",
+                          ephemeral=True
+                      )
+                     return # Cannot proceed without a voice channel
+                finally:
+                     # Once created, the channel is in self.voice_channels and holds the number itself
+                     self._qrf_reservations[host_guild.id].discard(next_number)
+
+
+                # Initialize sos_data after successful voice channel creation
+                sos_data = SOSSession(
+                    user_ids={interaction.user.id},
+                    fleet_response=interaction.user.display_name,
+                    voice_channel=voice_channel,
+                    initiator_id=interaction.user.id
+                )
+
+
+                fleet_response = sos_data.fleet_response
+
+                # Build the embed
+                embed = discord.Embed(
+                    title="SOS ACTIVATED",
+                    description=(
+                        # Use the invite_url variable here
+                        f"**Comms:** {invite_url}\n\n" # Plain text URL
+                        f"**Enemy:** {view.enemy_type or 'Open'}\n"
+                        f"**Difficulty:** {view.difficulty or 'Open'}\n"
+                        f"**Mission Focus:** {view.mission or 'Open'}\n"
+                        f"**Voice:** {view.voice or 'Open'}\n"
+                        f"**Notes:** {view.notes or 'None'}\n\n"
+                    ),
+                    color=discord.Color.red()
+                )
+                embed.add_field(name="HOST CLAN", value=host_guild.name, inline=False)
+                embed.add_field(name="Status", value="**Open**", inline=False)
+                status_index = len(embed.fields) - 1
+                embed.add_field(name="Fleet Response", value=fleet_response, inline=False)
+                fleet_response_index = len(embed.fields) - 1
+
+                sos_data.embed = embed
+                sos_data.status_index = status_index
+                sos_data.fleet_response_index = fleet_response_index
+
+
+                # Broadcast to all known GPT channels in the network
+                all_servers_data = await roster_task
+            finally:
+                # Covers every early return and error before the roster is awaited
+                if not roster_task.done():
+                    roster_task.cancel()
 
             logging.info(f"Broadcasting SOS to {len(all_servers_data)} configured servers.")
 
+            # Resolve every target channel and its ping content first, then send them all concurrently
+            broadcast_targets = []
             for server_data in all_servers_data:
                 server_guild_id = server_data.get("discord_server_id")
                 server_gpt_channel_id = server_data.get("gpt_channel_id")
@@ -348,27 +510,39 @@ class SOSCog(commands.Cog):
                          logging.warning(f"SOS LFG role ID {sos_lfg_role_id} found in DB but role object not found in guild '{server_guild.name}'. Cannot ping.")
 
 
-                try:
-                    # Ensure bot has send_messages permission in this channel before sending
-                    if not server_gpt_channel.permissions_for(server_guild.me).send_messages:
-                         logging.warning(f"Bot lacks 'Send Messages' permission in channel '{server_gpt_channel.name}' ({server_gpt_channel.id}) in guild '{server_guild.name}'. Cannot send SOS embed.")
-                         continue # Skip this guild if cannot send messages
-
-                    # Send the message with the optional ping_content AND the embed
-                    # discord.py will handle Forbidden for mentions if somehow the permission check above is insufficient
-                    sos_message = await server_gpt_channel.send(content=ping_content, embed=embed)
-                    sos_data['sos_messages'][server_guild.id] = sos_message
-                    logging.info(f"Sent SOS embed {'with' if ping_content else 'without'} ping to guild '{server_guild.name}'.")
-                except discord.Forbidden:
+                # Ensure bot has send_messages permission in this channel before sending
+                if not server_gpt_channel.permissions_for(server_guild.me).send_messages:
+                     logging.warning(f"Bot lacks 'Send Messages' permission in channel '{server_gpt_channel.name}' ({server_gpt_channel.id}) in guild '{server_guild.name}'. Cannot send SOS embed.")
+                     continue # Skip this guild if cannot send messages
+
+                broadcast_targets.append((server_guild, server_gpt_channel, ping_content))
+
+            # Send the message with the optional ping_content AND the embed
+            # discord.py will handle Forbidden for mentions if somehow the permission check above is insufficient
+            results = await asyncio.gather(
+                *(self._broadcast_call(channel.send(content=ping_content, embed=embed)) for _, channel, ping_content in broadcast_targets),
+                return_exceptions=True
+            )
+            for (server_guild, server_gpt_channel, ping_content), result in zip(broadcast_targets, results):
+                if isinstance(result, discord.Forbidden):
                     # Catch forbidden errors specifically, might happen for send or mention
                     logging.error(f"Bot is forbidden from sending messages/mentions to channel '{server_gpt_channel.name}' ({server_gpt_channel.id}) in guild '{server_guild.name}'. Check channel permissions.")
-                except Exception as e:
-                    logging.error(f"Error sending SOS embed to guild '{server_guild.name}': {e}")
+                elif isinstance(result, Exception):
+                    logging.error(f"Error sending SOS embed to guild '{server_guild.name}': {result}")
+                else:
+                    sos_data.sos_messages[server_guild.id] = result
+                    logging.info(f"Sent SOS embed {'with' if ping_content else 'without'} ping to guild '{server_guild.name}'.")
 
             # Store sos_data after broadcasting (even if some broadcasts failed)
             if voice_channel: # Ensure voice_channel was created successfully
                  self.sos_data_by_channel[voice_channel.id] = sos_data
                  logging.debug(f"Added sos_data for channel {voice_channel.id} to tracking.")
+                 # Expire the SOS once its invite lapses, even if nobody ever joins the
+                 # voice channel (on_voice_state_update only schedules cleanup on leave)
+                 sos_data.expiry_handle = asyncio.get_running_loop().call_later(
+                     SOS_TTL_SECONDS,
+                     lambda channel_id=voice_channel.id: self._run_in_background(self.expire_sos(channel_id))
+                 )
 
             # Confirm to the user via the original interaction followup
             # Use try-except blocks for interaction responses as well
@@ -411,6 +585,14 @@ class SOSCog(commands.Cog):
         # Ignore bot state updates
         voice_channel_id = None
 
+        # Keep the tracked member counts in step with channel moves. Mute/deafen updates
+        # keep the same channel, and bots are counted like voice_channel.members counts them.
+        if before.channel != after.channel:
+            if before.channel and before.channel.id in self.voice_member_counts:
+                self.voice_member_counts[before.channel.id] = max(0, self.voice_member_counts[before.channel.id] - 1)
+            if after.channel and after.channel.id in self.voice_member_counts:
+                self.voice_member_counts[after.channel.id] += 1
+
         # Check if the channel has been empty for 2 minutes (120 seconds) at the start
         # This handles cases where the event might be delayed
         if before.channel and before.channel.id in self.voice_channels:
@@ -418,7 +600,7 @@ class SOSCog(commands.Cog):
             voice_channel = self.voice_channels.get(voice_channel_id)
             sos_data = self.sos_data_by_channel.get(voice_channel_id)
 
-            if voice_channel and len(voice_channel.members) == 0 and sos_data and (time.time() - sos_data['last_activity']) > 120:
+            if voice_channel and self.voice_member_counts.get(voice_channel_id, 0) == 0 and sos_data and (time.time() - sos_data.last_activity) > 120:
                 logging.info(f"Voice channel {voice_channel_id} was empty for over 2 minutes. Deleting.")
                 await self.delete_voice_channel_and_message(voice_channel_id)
                 return # Stop processing if the channel was just deleted
@@ -429,56 +611,25 @@ class SOSCog(commands.Cog):
         # Member joined a voice channel
         if after.channel and after.channel.id in self.voice_channels:
             voice_channel_id = after.channel.id
-            # Cancel any pending cleanup task for this channel
-            cleanup_task = self.cleanup_tasks.pop(voice_channel_id, None)
-            if cleanup_task and not cleanup_task.done(): # .done() also requires discord.py 2.0+
-                 try:
-                     cleanup_task.cancel()
-                     logging.debug(f"Cancelled cleanup task for channel {voice_channel_id} because a member joined.")
-                 except AttributeError:
-                      logging.warning("discord.py version does not support task.done(). Cannot check/cancel cleanup task reliably.")
+            # Cancel any pending cleanup timer for this channel
+            cleanup_handle = self.cleanup_handles.pop(voice_channel_id, None)
+            if cleanup_handle:
+                 cleanup_handle.cancel()
+                 logging.debug(f"Cancelled cleanup timer for channel {voice_channel_id} because a member joined.")
 
 
             sos_data = self.sos_data_by_channel.get(voice_channel_id)
             if sos_data:
-                 sos_data['last_activity'] = time.time() # Update last activity time
+                 sos_data.last_activity = time.time() # Update last activity time
                  # Acquire the lock before modifying shared sos_data
-                 async with sos_data['lock']:
-                     status_field = sos_data['embed'].fields[sos_data['status_index']]
-                     if status_field.value != '**Closed**': # Check if status isn't already closed
-                         if member.id not in sos_data['users']: # Check if user is already in the list
-                             sos_data['users'][member.id] = member.display_name
-                             fleet_response = '\n'.join(sos_data['users'].values())
-                             # Update the embed field
-                             sos_data['embed'].set_field_at(
-                                 index=sos_data['fleet_response_index'],
-                                 name='Fleet Response',
-                                 value=fleet_response,
-                                 inline=False
-                             )
-                             # Check if team is full (4 members)
-                             if len(sos_data['users']) >= 4:
-                                 sos_data['embed'].set_field_at(
-                                     index=sos_data['status_index'],
-                                     name='Status',
-                                     value='**Closed**', # Set status to Closed
-                                     inline=False
-                                 )
-                             # Update the SOS message embeds in all guilds
-                             for guild_id, sos_message in sos_data['sos_messages'].items():
-                                 try:
-                                     # Check if message object is still valid/cached
-                                     if sos_message and isinstance(sos_message, discord.Message):
-                                         await sos_message.edit(embed=sos_data['embed'])
-                                         logging.debug(f"Updated SOS embed in guild {guild_id} for channel {voice_channel_id} after {member.display_name} joined.")
-                                     else:
-                                         logging.warning(f"SOS message object for guild {guild_id} in channel {voice_channel_id} is invalid/not cached during update.")
-
-                                 except discord.NotFound:
-                                      logging.warning(f"Failed to find message {sos_message.id if isinstance(sos_message, discord.Message) else 'invalid'} in guild {guild_id} for channel {voice_channel_id} during update (NotFound).")
-                                 except Exception as e:
-                                     logging.error(f"Error updating SOS embed in guild {guild_id} for channel {voice_channel_id}: {e}")
-                     # If status is already closed, no need to update users/status
+                 async with sos_data.lock:
+                     # A full team (4 members) closes the SOS, so later joiners aren't listed
+                     if len(sos_data.user_ids) < 4 and member.id not in sos_data.user_ids:
+                         sos_data.user_ids.add(member.id)
+                         sos_data.fleet_response += '\n' + member.display_name
+                         # Joiners arriving within the debounce window share one embed edit per guild
+                         if sos_data.edit_task is None:
+                             sos_data.edit_task = asyncio.create_task(self._coalesce_sos_edits(voice_channel_id, sos_data))
 
 
         # Member left a voice channel
@@ -487,66 +638,112 @@ class SOSCog(commands.Cog):
             # sos_data is needed to update last_activity, but we don't need the lock just for that.
             voice_channel = self.voice_channels.get(voice_channel_id)
 
-            if voice_channel and len(voice_channel.members) == 0:
+            if voice_channel and self.voice_member_counts.get(voice_channel_id, 0) == 0:
                 # Schedule cleanup if it's not already scheduled
                 # Ensure we don't schedule cleanup if members are still present
-                if voice_channel_id not in self.cleanup_tasks:
-                    cleanup_task = asyncio.create_task(self.schedule_cleanup(voice_channel_id, 60)) # 60 second delay
+                if voice_channel_id not in self.cleanup_handles:
                     # Update last activity time when the channel becomes empty
                     sos_data = self.sos_data_by_channel.get(voice_channel_id)
                     if sos_data:
-                        sos_data['last_activity'] = time.time()
-                    self.cleanup_tasks[voice_channel_id] = cleanup_task
-                    logging.debug(f"Scheduled cleanup task for channel {voice_channel_id} in 60 seconds.")
-            elif voice_channel and len(voice_channel.members) > 0:
-                 # If members are still in the channel, ensure any cleanup task is cancelled
+                        sos_data.last_activity = time.time()
+                    self.cleanup_handles[voice_channel_id] = asyncio.get_running_loop().call_later(
+                        60, # 60 second delay
+                        lambda channel_id=voice_channel_id: self._run_in_background(self.run_cleanup(channel_id))
+                    )
+                    logging.debug(f"Scheduled cleanup for channel {voice_channel_id} in 60 seconds.")
+            elif voice_channel and self.voice_member_counts.get(voice_channel_id, 0) > 0:
+                 # If members are still in the channel, ensure any cleanup timer is cancelled
                  # This handles cases where the last person left briefly, then someone else joined
-                 cleanup_task = self.cleanup_tasks.pop(voice_channel_id, None)
-                 if cleanup_task: # Check if task exists
-                     try: # Check if task is done before cancelling (requires discord.py 2.0+)
-                         if not cleanup_task.done():
-                              cleanup_task.cancel()
-                              logging.debug(f"Cancelled cleanup task for channel {voice_channel_id} because members are still present.")
-                         else:
-                             logging.debug(f"Cleanup task for channel {voice_channel_id} was already done.")
-                     except AttributeError:
-                         logging.warning("discord.py version does not support task.done(). Cannot reliably cancel cleanup task.")
-                         # If done() is not supported, we might cancel a completed task, which is harmless.
-                         # Just attempt cancel if task exists.
-                         try:
-                              cleanup_task.cancel()
-                              logging.debug(f"Attempted to cancel cleanup task for channel {voice_channel_id} (done() not supported).")
-                         except Exception as e:
-                             logging.error(f"Error attempting to cancel cleanup task for channel {voice_channel_id}: {e}")
+                 cleanup_handle = self.cleanup_handles.pop(voice_channel_id, None)
+                 if cleanup_handle:
+                     cleanup_handle.cancel()
+                     logging.debug(f"Cancelled cleanup timer for channel {voice_channel_id} because members are still present.")
 
 
-    async def schedule_cleanup(self, channel_id, delay):
-        try:
-            logging.debug(f"Cleanup task for channel {channel_id} starting sleep for {delay} seconds.")
-            await asyncio.sleep(delay)
-            logging.debug(f"Cleanup task for channel {channel_id} finished sleep.")
+    async def _coalesce_sos_edits(self, channel_id, sos_data):
+        """
+        Waits SOS_EDIT_DEBOUNCE_SECONDS for further joiners, then rebuilds the embed's
+        Fleet Response/Status fields once and edits every broadcast message concurrently.
+        """
+        await asyncio.sleep(SOS_EDIT_DEBOUNCE_SECONDS)
+        async with sos_data.lock:
+            # Joiners from here on schedule the next edit
+            sos_data.edit_task = None
+            sos_data.embed.set_field_at(
+                index=sos_data.fleet_response_index,
+                name='Fleet Response',
+                value=sos_data.fleet_response,
+                inline=False
+            )
+            # Check if team is full (4 members)
+            if len(sos_data.user_ids) >= 4:
+                sos_data.embed.set_field_at(
+                    index=sos_data.status_index,
+                    name='Status',
+                    value='**Closed**', # Set status to Closed
+                    inline=False
+                )
+
+            # Update the SOS message embeds in all guilds concurrently
+            edit_targets = []
+            for guild_id, sos_message in sos_data.sos_messages.items():
+                # Check if message object is still valid/cached
+                if sos_message and isinstance(sos_message, discord.Message):
+                    edit_targets.append((guild_id, sos_message))
+                else:
+                    logging.warning(f"SOS message object for guild {guild_id} in channel {channel_id} is invalid/not cached during update.")
+
+            results = await asyncio.gather(
+                *(self._broadcast_call(sos_message.edit(embed=sos_data.embed)) for _, sos_message in edit_targets),
+                return_exceptions=True
+            )
+            for (guild_id, sos_message), result in zip(edit_targets, results):
+                if isinstance(result, discord.NotFound):
+                    logging.warning(f"Failed to find message {sos_message.id} in guild {guild_id} for channel {channel_id} during update (NotFound).")
+                elif isinstance(result, Exception):
+                    logging.error(f"Error updating SOS embed in guild {guild_id} for channel {channel_id}: {result}")
+                else:
+                    logging.debug(f"Updated SOS embed in guild {guild_id} for channel {channel_id} ({len(sos_data.user_ids)} in fleet).")
+
+
+    def _recount_members(self, voice_channel):
+        """
+        Returns how many members are in a tracked voice channel, read from the guild's
+        voice state cache, and resyncs voice_member_counts with it. The counter is only
+        a fast path for on_voice_state_update; missed events (e.g. during a gateway
+        reconnect) would otherwise leave it wrong for the rest of the SOS.
+        """
+        count = len(voice_channel.members)
+        self.voice_member_counts[voice_channel.id] = count
+        return count
 
+
+    async def run_cleanup(self, channel_id):
+        """Runs when a channel's cleanup timer fires: deletes the SOS if the channel is still empty."""
+        # The timer has fired, so it no longer needs cancelling
+        self.cleanup_handles.pop(channel_id, None)
+        try:
             voice_channel = self.voice_channels.get(channel_id)
             # Re-check if the channel is still empty after the delay
-            if voice_channel and len(voice_channel.members) == 0:
+            if voice_channel and self._recount_members(voice_channel) == 0:
                 logging.info(f"Channel {channel_id} is still empty after delay. Proceeding with deletion.")
                 await self.delete_voice_channel_and_message(channel_id)
             elif voice_channel:
                 logging.info(f"Channel {channel_id} has members again. Cleanup cancelled.")
-                # If members are back, remove the cleanup task entry
-                self.cleanup_tasks.pop(channel_id, None)
             else:
                  logging.warning(f"Voice channel object with ID {channel_id} not found during scheduled cleanup.")
-
-
-        except asyncio.CancelledError:
-            logging.debug(f"Cleanup task for channel {channel_id} was cancelled.")
-            # Clean up the task entry if it was cancelled
-            self.cleanup_tasks.pop(channel_id, None)
         except Exception as e:
             logging.error(f"Error in scheduled cleanup for channel {channel_id}: {e}")
-            # Clean up the task entry on unexpected errors
-            self.cleanup_tasks.pop(channel_id, None)
+
+
+    async def expire_sos(self, channel_id):
+        """Deletes an SOS that reached SOS_TTL_SECONDS, unless its voice channel is in use."""
+        voice_channel = self.voice_channels.get(channel_id)
+        if voice_channel and self._recount_members(voice_channel) == 0:
+            logging.info(f"SOS for voice channel {channel_id} expired after {SOS_TTL_SECONDS} seconds. Deleting.")
+            await self.delete_voice_channel_and_message(channel_id)
+        elif voice_channel:
+            logging.debug(f"SOS for voice channel {channel_id} reached its TTL but is in use. Leaving it to the empty-channel cleanup.")
 
 
     async def delete_voice_channel_and_message(self, channel_id):
@@ -561,52 +758,74 @@ class SOSCog(commands.Cog):
             # If voice_channel is not found, maybe sos_data still exists?
             # Proceed to try deleting messages if sos_data was found.
 
-        if voice_channel and len(voice_channel.members) > 0:
+        if voice_channel and self._recount_members(voice_channel) > 0:
             logging.warning(f"Voice channel '{voice_channel.name}' (ID: {channel_id}) unexpectedly has members during deletion attempt. Aborting deletion.")
             # If members are found despite the scheduled cleanup check, put the channel/sos_data back
             self.voice_channels[channel_id] = voice_channel
             if sos_data:
                  self.sos_data_by_channel[channel_id] = sos_data
             return # Do not delete
+        self.voice_member_counts.pop(channel_id, None)
 
 
         logging.info(f"Proceeding to delete voice channel (ID: {channel_id}) and associated messages.")
 
-        # Delete associated SOS messages from all broadcast channels
+        # The SOS is going away, so its TTL and cleanup timers and any pending embed edit are no longer needed
+        if sos_data and sos_data.expiry_handle:
+            sos_data.expiry_handle.cancel()
+        if sos_data and sos_data.edit_task:
+            sos_data.edit_task.cancel()
+        cleanup_handle = self.cleanup_handles.pop(channel_id, None)
+        if cleanup_handle:
+            cleanup_handle.cancel()
+
+        # Delete associated SOS messages from all broadcast channels, concurrently with the voice channel
+        message_targets = []
         if sos_data:
-             for guild_id, sos_message in list(sos_data.get("sos_messages", {}).items()): # Iterate over a copy
-                 try:
-                     # Check if message object is still valid/cached before attempting delete
-                     if sos_message and isinstance(sos_message, discord.Message):
-                         await sos_message.delete()
-                         logging.info(f"Deleted SOS embed message (ID: {sos_message.id}) in guild ID {guild_id} for channel {channel_id}.")
-                     else:
-                         logging.warning(f"SOS message object for guild {guild_id} in channel {channel_id} is invalid/not cached during deletion.")
-
-                     # Always remove from tracking after attempting deletion for this guild's message
-                     sos_data["sos_messages"].pop(guild_id, None)
-
-                 except discord.NotFound:
-                     logging.warning(f"SOS embed message in guild ID {guild_id} already deleted or not found for channel {channel_id} (NotFound).")
-                     sos_data["sos_messages"].pop(guild_id, None) # Ensure it's removed from tracking
-                 except Exception as e:
-                     logging.error(f"Error deleting SOS embed message in guild ID {guild_id} for channel {channel_id}: {e}")
-                     # Decide whether to remove from tracking on error or retry later?
-                     # For simplicity now, let's remove it on error to prevent infinite loops on problematic messages.
-                     sos_data["sos_messages"].pop(guild_id, None)
-
-
-        # Delete the voice channel
-        if voice_channel:
-             try:
-                 await voice_channel.delete(reason="SOS QRF channel cleanup: empty.")
-                 logging.info(f"Deleted voice channel '{voice_channel.name}' (ID: {channel_id}).")
-             except discord.Forbidden:
-                 logging.error(f"Permission denied to delete voice channel '{voice_channel.name}' (ID: {channel_id}).")
-             except discord.NotFound:
-                 logging.warning(f"Voice channel '{voice_channel.name}' (ID: {channel_id}) already deleted.")
-             except Exception as e:
-                 logging.error(f"Failed to delete voice channel '{voice_channel.name}' (ID: {channel_id}): {e}")
+             for guild_id, sos_message in sos_data.sos_messages.items():
+                 # Check if message object is still valid/cached before attempting delete
+                 if sos_message and isinstance(sos_message, discord.Message):
+                     message_targets.append((guild_id, sos_message))
+                 else:
+                     logging.warning(f"SOS message object for guild {guild_id} in channel {channel_id} is invalid/not cached during deletion.")
+             # Everything is removed from tracking, whether or not its deletion succeeds,
+             # to prevent infinite loops on problematic messages.
+             sos_data.sos_messages = {}
+
+        await asyncio.gather(
+            self._delete_sos_messages(channel_id, message_targets),
+            self._delete_voice_channel(channel_id, voice_channel)
+        )
+
+
+    async def _delete_sos_messages(self, channel_id, message_targets):
+        """Deletes the (guild_id, message) SOS embeds concurrently, logging each outcome."""
+        results = await asyncio.gather(
+            *(self._broadcast_call(sos_message.delete()) for _, sos_message in message_targets),
+            return_exceptions=True
+        )
+        for (guild_id, sos_message), result in zip(message_targets, results):
+            if isinstance(result, discord.NotFound):
+                logging.warning(f"SOS embed message in guild ID {guild_id} already deleted or not found for channel {channel_id} (NotFound).")
+            elif isinstance(result, Exception):
+                logging.error(f"Error deleting SOS embed message in guild ID {guild_id} for channel {channel_id}: {result}")
+            else:
+                logging.info(f"Deleted SOS embed message (ID: {sos_message.id}) in guild ID {guild_id} for channel {channel_id}.")
+
+
+    async def _delete_voice_channel(self, channel_id, voice_channel):
+        """Deletes the SOS voice channel, if there is one."""
+        if not voice_channel:
+            return
+        try:
+            await voice_channel.delete(reason="SOS QRF channel cleanup: empty.")
+            logging.info(f"Deleted voice channel '{voice_channel.name}' (ID: {channel_id}).")
+        except discord.Forbidden:
+            logging.error(f"Permission denied to delete voice channel '{voice_channel.name}' (ID: {channel_id}).")
+        except discord.NotFound:
+            logging.warning(f"Voice channel '{voice_channel.name}' (ID: {channel_id}) already deleted.")
+        except Exception as e:
+            logging.error(f"Failed to delete voice channel '{voice_channel.name}' (ID: {channel_id}): {e}")
 
 
 async def setup(bot):
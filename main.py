@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 import traceback
 import discord
@@ -17,7 +18,8 @@ MONGO_URI = os.getenv('MONGODB_URI')
 if not MONGO_URI:
     raise EnvironmentError("MONGODB_URI environment variable not set.")
 
-client = AsyncIOMotorClient(MONGO_URI)
+# One client (and connection pool) shared by every cog via bot.mongo_db
+client = AsyncIOMotorClient(MONGO_URI, maxPoolSize=10, minPoolSize=2, serverSelectionTimeoutMS=5000)
 bot.mongo_db = client['GPTHellbot']  # Attach MongoDB instance to the bot
 
 async def check_mongo_connection():
@@ -33,7 +35,7 @@ async def check_mongo_connection():
 
 async def load_cogs():
     """
-    Load the bot's cogs in the correct order.
+    Load the bot's cogs.
     """
     cogs = [
         'cogs.sos_cog',               # Main SOS management cog (no dependencies)
@@ -45,13 +47,14 @@ async def load_cogs():
         'cogs.dm_response',           # Handles DM interactions for SOS responses
         'cogs.leaderboard_cog',       # <-- NEW: Our Leaderboard Cog
     ]
-    for cog in cogs:
-        try:
-            await bot.load_extension(cog)
+    # No cog needs another at load time (they look each other up when used), so load them concurrently
+    results = await asyncio.gather(*(bot.load_extension(cog) for cog in cogs), return_exceptions=True)
+    for cog, result in zip(cogs, results):
+        if isinstance(result, Exception):
+            logging.error(f"Failed to load cog {cog}: {result}")
+            logging.error(''.join(traceback.format_exception(type(result), result, result.__traceback__)))
+        else:
             logging.info(f"Successfully loaded cog: {cog}")
-        except Exception as e:
-            logging.error(f"Failed to load cog {cog}: {e}")
-            logging.error(traceback.format_exc())
 
 @bot.event
 async def setup_hook():
@@ -62,9 +65,9 @@ async def setup_hook():
     await check_mongo_connection()  # Ensure MongoDB is accessible
     await load_cogs()
 
-    # If you have persistent views, register them here
-    from cogs.menu_view import SOSMenuView
-    bot.add_view(SOSMenuView(bot))  # Example persistent view
+    # Persistent views; MenuViewCog normally registered this already, so it's reused
+    from cogs.menu_view import get_sos_menu_view
+    get_sos_menu_view(bot)
     logging.info("Registered persistent views.")
 
 @bot.event